@@ -1,32 +1,50 @@
 import argparse
-import difflib
+import bisect
+import concurrent.futures
+import functools
 import io
 import logging
 import os
 import re
+import sys
 import urllib.parse
+from collections import defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from re import Match, Pattern
-from typing import Any, Optional, TypeAlias
+from typing import TYPE_CHECKING, Any, Optional, TypeAlias
 
-import jellyfish
 import pcpp
 from py_markdown_table.markdown_table import markdown_table
+from rapidfuzz.distance import JaroWinkler, LCSseq
 
 try:
     import pathspec
 except ImportError:
     pathspec = None
 
+if TYPE_CHECKING:
+    from pathspec import PathSpec
+
 # === Module-level Debug Storage ===
-DEBUG_INFO = []
+DEBUG_INFO: list[str | tuple[str, tuple[Any, ...]]] = []  # Messages, or (format, args) formatted on output
+
+
+def add_debug_info(message: str, *args: Any) -> None:
+    """Add debug information to be included in the output.
+
+    Args:
+        message (str): The message, or a %-style format string when args are given.
+        *args: Arguments for message; formatting is deferred until the debug info is printed.
+    """
+    DEBUG_INFO.append((message, args) if args else message)
 
 
-def add_debug_info(message: str) -> None:
-    """Add debug information to be included in the output."""
-    DEBUG_INFO.append(message)
+def format_debug_info() -> str:
+    """Return the collected debug information as newline-separated text."""
+    return "\n".join(entry if isinstance(entry, str) else entry[0] % entry[1] for entry in DEBUG_INFO)
 
 
 def clear_debug_info() -> None:
@@ -39,10 +57,14 @@ StructDict: TypeAlias = dict[str, Any]
 FieldDict: TypeAlias = dict[str, Any]
 ResultMap: TypeAlias = dict[str, dict[str, Any]]
 CompilationUnits: TypeAlias = dict[tuple[str, frozenset[str]], dict[str, set[str]]]
+# (cpp_name, cpp_data, alignment score, align_matches, report) from find_struct_candidates
+CandidateTuple: TypeAlias = tuple[
+    str, StructDict, float, list[tuple[FieldDict | None, FieldDict | None]], dict[str, Any]
+]
 
 
 # === Data Classes ===
-@dataclass
+@dataclass(slots=True)
 class StructCandidate:
     """Represents a candidate C++ struct for matching with an HLSL struct."""
 
@@ -53,7 +75,7 @@ class StructCandidate:
     report: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class StructMatch:
     """Represents a match between an HLSL struct and a C++ struct."""
 
@@ -74,7 +96,7 @@ class StructMatch:
         return bool(self.cpp_name and self.score > 0)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisLink:
     """Represents a link to struct analysis results."""
 
@@ -95,13 +117,102 @@ POINTER_SIZE = 8  # Assume 64-bit pointers for C++
 
 # Similarity thresholds
 NAME_SIM_THRESHOLD = 0.70  # Threshold for fuzzy LCS field name similarity
+PADDING_PREFIXES = ("pad", "_pad")  # Field name prefixes that mark padding (also covers "padding"/"_padding")
+PADDING_SUFFIXES = ("pad", "padding")  # Field name suffixes that mark padding (also covers "_padding")
 JARO_WINKLER_PREFIX_SCALE = 0.1  # Scaling factor for Jaro-Winkler prefix
 JARO_WINKLER_THRESHOLD = 0.7  # Threshold for Winkler boost
 MAX_PREFIX_LENGTH = 4  # Max prefix length for Winkler boost
 
+# Struct pairs below both ratios are scored as non-matches without field alignment
+SIZE_MISMATCH_RATIO = 0.25  # Smaller struct size / larger struct size
+FIELD_COUNT_MISMATCH_RATIO = 3  # Larger field count / smaller field count
+
 # Default size for unknown types
 DEFAULT_TYPE_SIZE = 4
 
+# File extensions picked up by the directory scan
+HLSL_EXTENSIONS = (".hlsl", ".hlsli")
+CPP_EXTENSIONS = (".cpp", ".h", ".hpp")
+# Lower-cased extension -> is_hlsl, for a single lookup per file
+SOURCE_EXTENSIONS = {**dict.fromkeys(HLSL_EXTENSIONS, True), **dict.fromkeys(CPP_EXTENSIONS, False)}
+
+# Paths under this directory are reported relative to it
+SHORT_PATH_MARKER = "skyrim-community-shaders"
+# Repository that short paths are linked against
+GITHUB_BLOB_URL = "https://github.com/doodlum/skyrim-community-shaders/blob/dev/"
+# Characters urllib.parse.quote leaves untouched (with the default safe="/")
+URL_SAFE_PATH_REGEX = re.compile(r"[A-Za-z0-9_.\-~/]*")
+
+# Shader stage defines tracked per buffer entry, in define-key order
+SHADER_DEFINES = ("PSHADER", "VSHADER", "VR")
+
+# Upper-cased name suffixes of shader stage input/output structs
+SHADER_IO_SUFFIXES = ("_INPUT", "_OUTPUT")
+
+# Conditional directives understood by preprocess_content
+CONDITIONAL_DIRECTIVES = ("#ifdef", "#ifndef", "#else", "#endif")
+
+# Precompiled patterns shared by the line-tracking helpers
+# e.g. #line 288 "features/Grass Lighting/Shaders/RunGrass.hlsl"
+LINE_DIRECTIVE_REGEX = re.compile(r'^#line\s+(?P<line>\d+)\s+"(?P<filename>[^"]*)"')
+NEWLINE_REGEX = re.compile(r"\n")
+# Same directive matched across a whole string; whitespace may not span lines
+LINE_DIRECTIVE_MULTILINE_REGEX = re.compile(r'^#line[^\S\n]+(?P<line>\d+)[^\S\n]+"(?P<filename>[^"\n]*)"', re.MULTILINE)
+# e.g. cbuffer PerFrame : register(b0) / Texture2D<float4> Tex : register(t1)
+BUFFER_DECL_REGEX = re.compile(r"(?P<name>\w+)\s*:\s*register\s*\([butsg]\d+\)", re.IGNORECASE)
+
+# Patterns and register types used by main() to scan shaders for buffers
+SHADER_BUFFER_REGEX = re.compile(
+    r"""(?P<type>
+            (?:cbuffer|ConstantBuffer<(?P<template_type>\w+)>) |
+            (?:(?:RW)?(?:StructuredBuffer|Buffer|Texture1D|Texture2D|Texture3D|TextureCube|RWBuffer|RWTexture1D|RWTexture2D|RWTexture3D|RWTextureCube|SamplerState|SamplerComparisonState))
+            (?:<(?P<template_name>\w+)>)?
+        )
+        \s+
+        (?P<name>\w+)
+        \s*:\s*register\s*\(
+            (?P<buffer_type>[a-z])
+            (?P<buffer_number>\d+)
+        \)
+        (?:\s*;\s*|$)
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+HLSL_FILE_REGEX = re.compile(r".*\.(hlsl|hlsli)$", re.IGNORECASE)
+FEATURE_DIR_REGEX = re.compile(r"features[/\\](?P<feature>[^/\\]+)")
+HLSL_REGISTER_TYPES = {"b": "CBV", "t": "SRV", "u": "UAV", "s": "Sampler"}
+
+# Precompiled patterns for struct extraction and field parsing
+# Structs, cbuffers and ConstantBuffers, or (RW)StructuredBuffer template declarations, in one scan
+HLSL_DECLARATION_REGEX = re.compile(
+    r"(struct|cbuffer|ConstantBuffer<(?P<template>\w+)>)\s+(?P<name>\w+)\s*(?::\s*register\s*\(\w\d+\s*\))?\s*{(?P<body>[^{}]*?)}"
+    r"|(?:RW)?(?:StructuredBuffer)<(?P<buffer_template>\w+)>\s+(?P<buffer_name>\w+)\s*:\s*register\s*\([a-z]\d+\s*\)",
+    re.MULTILINE | re.DOTALL,
+)
+CPP_STRUCT_REGEX = re.compile(
+    r"struct\s+(?:alignas\(\d+\)\s+)?(?P<name>\w+)\s*{(?P<body>[^{}]*?)}", re.MULTILINE | re.DOTALL
+)
+HLSL_FIELD_PATTERN = r"(?:(?:row|column)_major\s+)?(?P<type>[\w:]+(?:<\w+>)?(?:\w+)?)\s+(?P<name>\w+)(?:\s*:\s*packoffset\((?P<packoffset>[^);]+)\))?(?:\s*\[(?P<dim1>\d+)(?:\]\[(?P<dim2>\d+))?\])?"
+CPP_FIELD_PATTERN = (
+    r"(?P<type>[\w:]+(?:\w+)?(?:<\w+>)?\s*\*?)\s+(?P<name>\w+)(?:\s*\[(?P<dim1>\d+)(?:\]\[(?P<dim2>\d+))?\])?"
+)
+HLSL_FIELD_REGEX = re.compile(HLSL_FIELD_PATTERN)
+CPP_FIELD_REGEX = re.compile(CPP_FIELD_PATTERN)
+# One ;-terminated statement of a struct body per match, so a body is parsed in a single finditer scan.
+# The field groups are only set when the statement parses as a field; "rest" holds any unparsed text.
+HLSL_FIELD_STATEMENT_REGEX = re.compile(rf"\s*(?P<field>{HLSL_FIELD_PATTERN})?(?P<rest>[^;]*)(?:;|$)")
+CPP_FIELD_STATEMENT_REGEX = re.compile(rf"\s*(?P<static>static )?(?P<field>{CPP_FIELD_PATTERN})?(?P<rest>[^;]*)(?:;|$)")
+BLOCK_COMMENT_REGEX = re.compile(r"/\*.*?\*/", re.DOTALL)
+LINE_COMMENT_REGEX = re.compile(r"//.*$")
+PACKOFFSET_REGEX = re.compile(r"c(\d+)\.([xyzw])")
+PACKOFFSET_COMPONENT_OFFSETS = {"x": 0, "y": 4, "z": 8, "w": 12}  # Byte offset of each register component
+CONSTANT_BUFFER_TEMPLATE_REGEX = re.compile(r"ConstantBuffer<(\w+)>")
+ARRAY_TYPE_REGEX = re.compile(r"(.+?)\[(\d+)\]$")
+CPP_ARRAY_TYPE_REGEX = re.compile(r"(\w+)\[(\d+)\]")
+ARRAY_SUFFIX_REGEX = re.compile(r"\[.*?\]$")
+XM_MATRIX_REGEX = re.compile(r"FLOAT(\d)X(\d)")
+FLOAT_MATRIX_REGEX = re.compile(r"float(\d)x(\d)")
+
 
 class FileScanner:
     """Class to handle file scanning operations."""
@@ -114,13 +225,58 @@ class FileScanner:
         """
         self.cwd = cwd
         self.excluded_dirs = get_excluded_dirs(cwd)
+        self.ignore_spec = get_ignore_spec(cwd)
+        self._files: list[tuple[str, str, str, bool]] | None = None
+
+    def _walk_once(self) -> list[tuple[str, str, str, bool]]:
+        """Walk the directory tree once and cache every HLSL and C++ source file found.
+
+        Both the buffer and struct scans consume this list, so the tree is only traversed once.
+        The walk is deferred to the first scan rather than done in ``__init__`` so that
+        constructing a scanner does not traverse the tree. Paths matched by the
+        ``.gitignore`` spec are skipped, and ignored directories are not descended into.
+
+        Returns:
+            list[tuple[str, str, str, bool]]: (root, full_path, short_path, is_hlsl) per file.
+        """
+        if self._files is not None:
+            return self._files
+
+        files_found: list[tuple[str, str, str, bool]] = []
+        # os.walk is built on os.scandir and classifies entries from the cached DirEntry type,
+        # so no per-file stat is made; pruning dirs in place keeps excluded trees from being listed
+        ignore_spec = self.ignore_spec
+        for root, dirs, files in os.walk(self.cwd):
+            # Resolve the relative prefix once per directory instead of once per file
+            rel_root = os.path.relpath(root, self.cwd).replace("\\", "/")
+            rel_prefix = "" if rel_root == "." else f"{rel_root}/"
+            dirs[:] = [
+                d
+                for d in dirs
+                if d not in self.excluded_dirs and not (ignore_spec and ignore_spec.match_file(f"{rel_prefix}{d}/"))
+            ]
+            marker_start = root.replace("\\", "/").lower().find(SHORT_PATH_MARKER)
+            for file in files:
+                is_hlsl = SOURCE_EXTENSIONS.get(os.path.splitext(file)[1].lower())
+                if is_hlsl is None or (ignore_spec and ignore_spec.match_file(f"{rel_prefix}{file}")):
+                    continue
+                full_path = os.path.join(root, file).replace("\\", "/")
+                if marker_start != -1:
+                    short_path = full_path[marker_start + len(SHORT_PATH_MARKER) + 1 :]
+                elif SHORT_PATH_MARKER in file.lower():
+                    short_path = self._get_short_path(full_path)
+                else:
+                    short_path = f"{rel_prefix}{file}"
+                files_found.append((root, full_path, short_path, is_hlsl))
+        self._files = files_found
+        return files_found
 
     def _get_short_path(self, full_path: str) -> str:
         """Get shortened path relative to skyrim-community-shaders or cwd."""
         full_path = full_path.replace("\\", "/")
-        short_path_start = full_path.lower().find("skyrim-community-shaders")
+        short_path_start = full_path.lower().find(SHORT_PATH_MARKER)
         if short_path_start != -1:
-            return full_path[short_path_start + len("skyrim-community-shaders") + 1 :]
+            return full_path[short_path_start + len(SHORT_PATH_MARKER) + 1 :]
         return os.path.relpath(full_path, self.cwd).replace("\\", "/")
 
     def scan_for_buffers(
@@ -130,6 +286,7 @@ class FileScanner:
         shader_pattern: Pattern[str],
         hlsl_types: dict[str, str],
         defines_list: list[dict[str, str]],
+        jobs: int = 1,
     ) -> tuple[list[dict[str, Any]], dict[tuple[str, frozenset[str]], dict[str, set[str]]]]:
         """Scan HLSL files for buffer definitions and track compilation units.
 
@@ -139,6 +296,7 @@ class FileScanner:
             shader_pattern: Compiled regex pattern for buffer definitions.
             hlsl_types: Mapping of HLSL register types to descriptions.
             defines_list: List of preprocessor define dictionaries.
+            jobs: Number of worker processes; files are processed in the current process when 1.
 
         Returns:
             A tuple containing:
@@ -148,35 +306,34 @@ class FileScanner:
         result_map: dict[str, dict[str, Any]] = {}
         compilation_units: dict[tuple[str, frozenset[str]], dict[str, set[str]]] = {}
 
-        for root, dirs, files in os.walk(self.cwd):
-            dirs[:] = [d for d in dirs if d not in self.excluded_dirs]
-            feature = ""
-            root_normalized = root.replace("\\", "/")
-            feature_match = feature_pattern.search(root_normalized)
-            if feature_match:
-                feature = feature_match.group("feature")
-
-            for file in files:
-                if file.lower().endswith((".hlsl", ".hlsli")):
-                    full_path = os.path.join(root, file).replace("\\", "/")
-                    short_path = self._get_short_path(full_path)
-                    logging.debug(f"Processing file: {full_path}")
-
-                    for defines in defines_list:
-                        process_file(
-                            full_path,
-                            self.cwd,
-                            defines,
-                            shader_pattern,
-                            hlsl_types,
-                            feature,
-                            short_path,
-                            result_map,
-                            compilation_units,
-                        )
+        tasks: list[tuple[str, str, list[dict[str, str]], Pattern[str], dict[str, str], str, str]] = []
+        features: dict[str, str] = {}
+        for root, full_path, short_path, is_hlsl in self._walk_once():
+            if not is_hlsl:
+                continue
+            feature = features.get(root)
+            if feature is None:
+                feature_match = feature_pattern.search(root.replace("\\", "/"))
+                feature = features[root] = feature_match.group("feature") if feature_match else ""
+            tasks.append((full_path, self.cwd, defines_list, shader_pattern, hlsl_types, feature, short_path))
+
+        def _merge(file_results) -> None:
+            # Files are merged in walk order so the output matches a serial scan
+            for file_result_map, file_compilation_units in file_results:
+                result_map.update(file_result_map)
+                for unit_key, registers in file_compilation_units.items():
+                    unit = compilation_units.setdefault(unit_key, {})
+                    for reg, reg_features in registers.items():
+                        unit.setdefault(reg, set()).update(reg_features)
+
+        if jobs > 1 and len(tasks) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                _merge(executor.map(_scan_buffer_file, *zip(*tasks), chunksize=8))
+        else:
+            _merge(_scan_buffer_file(*task) for task in tasks)
 
         results = list(result_map.values())
-        logging.debug(f"Scan found {len(results)} buffers")
+        logging.debug("Scan found %s buffers", len(results))
         return results, compilation_units
 
     def scan_for_structs(
@@ -186,46 +343,39 @@ class FileScanner:
         hlsl_structs: dict[str, list[StructDict]] = {}
         cpp_structs: dict[str, list[StructDict]] = {}
 
-        for root, dirs, files in os.walk(self.cwd):
-            dirs[:] = [d for d in dirs if d not in self.excluded_dirs]
-            for f in files:
-                if not f.lower().endswith((".cpp", ".h", ".hpp", ".hlsl", ".hlsli")):
-                    continue
-                full_path = os.path.normpath(os.path.join(root, f))
-                try:
-                    with open(full_path, encoding="utf-8", errors="ignore") as file:
-                        content = file.read()
-                    short_path = self._get_short_path(full_path)
-                    is_hlsl = full_path.lower().endswith((".hlsl", ".hlsli"))
-                    structs = extract_structs(content, is_hlsl, short_path)
-                    target = hlsl_structs if is_hlsl else cpp_structs
-                    for name, data in structs.items():
-                        if is_shader_io_struct(name):
-                            logging.debug(f"Skipping shader IO buffer: {name} in {short_path}")
-                            continue
+        for _root, full_path, short_path, is_hlsl in self._walk_once():
+            try:
+                with open(full_path, encoding="utf-8", errors="ignore") as file:
+                    content = file.read()
+                structs = extract_structs(content, is_hlsl, short_path)
+                target = hlsl_structs if is_hlsl else cpp_structs
+                for name, data in structs.items():
+                    if is_shader_io_struct(name):
+                        logging.debug("Skipping shader IO buffer: %s in %s", name, short_path)
+                        continue
 
-                        if not isinstance(data, dict):
-                            logging.error(f"Invalid struct data for {name} in {short_path}: {data}")
+                    if not isinstance(data, dict):
+                        logging.error(f"Invalid struct data for {name} in {short_path}: {data}")
+                        continue
+                    data["name"] = name
+
+                    # Check if we already have a real definition and this is a template
+                    if name in target and data.get("is_template", False):
+                        # Check if any existing definition is not a template (has fields)
+                        has_real_definition = any(
+                            existing.get("fields") and not existing.get("is_template", False)
+                            for existing in target[name]
+                        )
+                        if has_real_definition:
+                            logging.debug("Skipping template %s - real struct definition already exists", name)
                             continue
-                        data["name"] = name
-
-                        # Check if we already have a real definition and this is a template
-                        if name in target and data.get("is_template", False):
-                            # Check if any existing definition is not a template (has fields)
-                            has_real_definition = any(
-                                existing.get("fields") and not existing.get("is_template", False)
-                                for existing in target[name]
-                            )
-                            if has_real_definition:
-                                logging.debug(f"Skipping template {name} - real struct definition already exists")
-                                continue
-
-                        if name not in target:
-                            target[name] = []
-                        target[name].append(data)
-                        logging.debug(f"Added {name} from {short_path} to {'hlsl' if is_hlsl else 'cpp'} structs")
-                except Exception as e:
-                    logging.warning(f"Failed to read or process file {full_path}: {e}")
+
+                    if name not in target:
+                        target[name] = []
+                    target[name].append(data)
+                    logging.debug("Added %s from %s to %s structs", name, short_path, "hlsl" if is_hlsl else "cpp")
+            except Exception as e:
+                logging.warning(f"Failed to read or process file {full_path}: {e}")
 
         return hlsl_structs, cpp_structs
 
@@ -240,7 +390,8 @@ def create_link(text: str, line: int | None = None) -> str:
     Returns:
         str: A URL pointing to the file in the skyrim-community-shaders repository.
     """
-    base_url = f"https://github.com/doodlum/skyrim-community-shaders/blob/dev/{urllib.parse.quote(text)}"
+    quoted = text if URL_SAFE_PATH_REGEX.fullmatch(text) else urllib.parse.quote(text)
+    base_url = f"{GITHUB_BLOB_URL}{quoted}"
     if line is not None:
         base_url += f"#L{line}"
     return base_url
@@ -309,66 +460,54 @@ def finditer_with_line_numbers(
     Returns:
         list[tuple[int, Match[str]]]: A list of tuples containing the adjusted line number and match object.
     """
-    # Handle pcpp info on skipped lines
-    line_offsets: dict[int, int] = {}
-    for line_number, line in enumerate(string.splitlines()):
-        line_adjust = r"^#line (?P<line>[0-9]+) \"(?P<filename>.*)\""
-        line_match = re.match(line_adjust, line)
-        if line_match:
-            offset = int(line_match.group("line")) - line_number - 1
-            line_offsets[line_number] = offset
-
-    matches = list(re.finditer(pattern, string, flags))
+    regex = pattern if isinstance(pattern, Pattern) else re.compile(pattern, flags)
+    matches = list(regex.finditer(string))
     if not matches:
         return []
 
-    end = matches[-1].start()
-    newline_table = {-1: 0}
-    for i, m in enumerate(re.finditer("\\n", string), 1):
-        offset = m.start()
-        if offset > end:
-            break
-        newline_table[offset] = i
+    # A match's line is the number of newlines before it, so index newline offsets once
+    newline_offsets = [m.start() for m in NEWLINE_REGEX.finditer(string)]
+
+    # Handle pcpp info on skipped lines: one scan for the #line directives instead of a per-line match.
+    # Directives are found in order, so the line indices are already sorted for bisect.
+    offset_lines: list[int] = []
+    offset_values: list[int] = []
+    for line_match in LINE_DIRECTIVE_MULTILINE_REGEX.finditer(string):
+        line_number = bisect.bisect_left(newline_offsets, line_match.start())
+        offset_lines.append(line_number)
+        offset_values.append(int(line_match.group("line")) - line_number - 1)
 
     result: list[tuple[int, Match[str]]] = []
     for m in matches:
-        newline_offset = string.rfind("\n", 0, m.start())
-        line_number = newline_table[newline_offset] + 1  # Add 1 since line numbers are 1-based
+        line_number = bisect.bisect_left(newline_offsets, m.start()) + 1  # Add 1 since line numbers are 1-based
         # Apply line_map if provided
         if line_map and line_number in line_map:
             line_number = line_map[line_number]
-        # Apply #line directive offset
-        found_offset = 0
-        for k, v in line_offsets.items():
-            if k <= line_number:
-                found_offset = v
-            else:
-                break
+        # Apply offset of the last #line directive at or before this line
+        idx = bisect.bisect_right(offset_lines, line_number) - 1
+        found_offset = offset_values[idx] if idx >= 0 else 0
         adjusted_line = line_number + found_offset
         result.append((adjusted_line, m))
     return result
 
 
-def capture_pattern(text: str, pattern: str) -> list[tuple[int, Match[str]]]:
+def capture_pattern(text: str, pattern: str | Pattern[str]) -> list[tuple[int, Match[str]]]:
     """Capture matches of a pattern in the given text, accounting for line directives.
 
     Args:
         text: The text to search.
-        pattern: The regular expression pattern to match.
+        pattern: The regular expression pattern to match, as a string or precompiled pattern.
 
     Returns:
         list[tuple[int, Match[str]]]: A list of tuples containing the line number and match object.
     """
-    # line adjust
-    # line 288 "features/Grass Lighting/Shaders/RunGrass.hlsl"
-    line_adjust = r"^#line (?P<line>[0-9]+) \"(?P<filename>.*)\""
-    # Compile the regular expression pattern.
+    # Compile the regular expression pattern (no-op for precompiled patterns).
     regex = re.compile(pattern)
     results: list[tuple[int, Match[str]]] = []
     offset = 1
     # Iterate over the lines of the text.
     for line_number, line in enumerate(text.splitlines()):
-        line_match = re.match(line_adjust, line)
+        line_match = LINE_DIRECTIVE_REGEX.match(line)
         if line_match:
             offset = int(line_match.group("line")) - line_number - 1
 
@@ -440,6 +579,47 @@ def get_excluded_dirs(cwd: str) -> set[str]:
     return excluded_dirs
 
 
+def get_ignore_spec(cwd: str) -> "PathSpec | None":
+    """Load the .gitignore in cwd as a path spec for matching relative paths.
+
+    Unlike get_excluded_dirs, which only yields directory basenames, the spec also
+    honours nested paths, file patterns and negations.
+
+    Args:
+        cwd: Current working directory.
+
+    Returns:
+        pathspec.PathSpec | None: The parsed spec, or None if there is no .gitignore or pathspec is unavailable.
+    """
+    gitignore_path = os.path.join(cwd, ".gitignore")
+    if not os.path.isfile(gitignore_path) or pathspec is None:
+        return None
+
+    try:
+        with open(gitignore_path) as file:
+            return pathspec.PathSpec.from_lines("gitwildmatch", file)
+    except Exception as e:
+        logging.warning(f"Failed to parse .gitignore: {e}. Ignoring path rules.")
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def get_define_key(define_set: frozenset[str]) -> str:
+    """Get the canonical key for a define combination.
+
+    Only the shader stage defines take part, in ``SHADER_DEFINES`` order, e.g.
+    ``{"VR", "PSHADER"}`` -> ``"PSHADER_VR"``. The set of combinations is small
+    and fixed, so each key is built once and interned.
+
+    Args:
+        define_set: Names of the active defines.
+
+    Returns:
+        str: The define key, or ``"no_defines"`` if no stage define is set.
+    """
+    return sys.intern("_".join(d for d in SHADER_DEFINES if d in define_set) or "no_defines")
+
+
 def preprocess_content(content: str, defines: dict[str, str]) -> str:
     """Preprocess HLSL content to include/exclude code based on defines.
 
@@ -450,14 +630,21 @@ def preprocess_content(content: str, defines: dict[str, str]) -> str:
     Returns:
         str: Preprocessed content with applied defines.
     """
-    lines = content.splitlines()
-    output = []
+    output: list[str] = []
     include = True
     skip_depth = 0
 
-    for line in lines:
+    for line in content.splitlines():
+        # Fast path: lines without a directive are only stripped when they are kept
+        if "#" not in line:
+            if include:
+                output.append(line.strip())
+            continue
         line = line.strip()
-        if line.startswith("#ifdef") or line.startswith("#ifndef"):
+        if not line.startswith(CONDITIONAL_DIRECTIVES):
+            if include:
+                output.append(line)
+        elif line.startswith(("#ifdef", "#ifndef")):
             macro = line.split()[1]
             is_ifdef = line.startswith("#ifdef")
             should_include = (macro in defines) if is_ifdef else (macro not in defines)
@@ -474,12 +661,109 @@ def preprocess_content(content: str, defines: dict[str, str]) -> str:
                 skip_depth -= 1
             if skip_depth == 0:
                 include = True
-        elif include:
-            output.append(line)
 
     return "\n".join(output)
 
 
+@functools.lru_cache(maxsize=8)
+def _compute_include_dirs(cwd: str) -> tuple[str, ...]:
+    """Discover the shared include directories for a project root.
+
+    The result only depends on ``cwd`` so it is cached; the directory walk would
+    otherwise be repeated for every file and defines combination.
+
+    Args:
+        cwd: Normalized project root.
+
+    Returns:
+        tuple[str, ...]: Deduplicated include directories in search order.
+    """
+    include_dirs: list[str] = []
+
+    common_dir = os.path.join(cwd, "package", "Shaders", "Common")
+    if os.path.isdir(common_dir):
+        for root, _, _ in os.walk(common_dir):
+            include_dirs.append(root)
+
+    features_dir = os.path.join(cwd, "features")
+    if os.path.isdir(features_dir):
+        for feature_dir in Path(features_dir).glob("*/Shaders"):
+            include_dirs.append(str(feature_dir))
+
+    aio_shaders_dir = os.path.join(cwd, "Shaders")
+    if os.path.isdir(aio_shaders_dir) and "aio" in cwd.lower():
+        include_dirs.append(aio_shaders_dir)
+    return tuple(dict.fromkeys(include_dirs))
+
+
+def _build_line_map(contents: str, original_lines: list[str], path: str) -> dict[int, int]:
+    """Map preprocessed lines of ``path`` back to their original line numbers.
+
+    Lines are handled in runs between ``#line`` directives. Once the original
+    line cursor agrees with the directive's line number every line in the run
+    maps one-to-one, so the rest of the run is filled in with ranges rather
+    than compared line by line.
+
+    Args:
+        contents: pcpp output including ``#line`` directives.
+        original_lines: Lines of the unprocessed source file.
+        path: Normalized path of the source file.
+
+    Returns:
+        dict[int, int]: Preprocessed line index -> original line number.
+    """
+    line_map: dict[int, int] = {}
+    preprocessed_line = 0
+    current_file = path
+    current_line = 0
+    orig_line_idx = 0
+    num_original = len(original_lines)
+
+    lines = contents.splitlines()
+    directives: list[tuple[int, Match[str] | None]] = [
+        (i, line_match)
+        for i, line in enumerate(lines)
+        if line.startswith("#line") and (line_match := LINE_DIRECTIVE_REGEX.match(line))
+    ]
+    directives.append((len(lines), None))
+
+    run_start = 0
+    for run_end, line_match in directives:
+        if current_file == path:
+            idx = run_start
+            # Resync against the original source until the cursors line up
+            while idx < run_end and orig_line_idx < num_original and orig_line_idx != current_line - 1:
+                line_map[preprocessed_line] = current_line
+                preprocessed_line += 1
+                if lines[idx].strip() == original_lines[orig_line_idx].strip():
+                    current_line = orig_line_idx + 1
+                orig_line_idx += 1
+                current_line += 1
+                idx += 1
+            remaining = run_end - idx
+            line_map.update(
+                zip(
+                    range(preprocessed_line, preprocessed_line + remaining),
+                    range(current_line, current_line + remaining),
+                )
+            )
+            preprocessed_line += remaining
+            if orig_line_idx < num_original:
+                orig_line_idx = min(orig_line_idx + remaining, num_original)
+            current_line += remaining
+        else:
+            current_line += run_end - run_start
+
+        if line_match is None:
+            break
+        current_line = int(line_match.group(1))
+        current_file = line_match.group(2).replace("\\", "/")
+        orig_line_idx = min(current_line - 1, num_original - 1)
+        run_start = run_end + 1
+
+    return line_map
+
+
 def process_file(
     path: str,
     cwd: str,
@@ -490,40 +774,36 @@ def process_file(
     short_path: str,
     result_map: dict[str, dict[str, Any]],
     compilation_units: dict[tuple[str, frozenset[str]], dict[str, set[str]]],
+    original_contents: str | None = None,
 ) -> None:
-    """Process a shader file to extract buffers and update result maps."""
+    """Process a shader file to extract buffers and update result maps.
+
+    Callers running several defines combinations over the same file can pass
+    ``original_contents`` so the source is only read once.
+    """
 
     def _should_skip_buffer(buffer_name, mapped_line, original_lines):
         if buffer_name.lower() in BASE_TYPE_SIZES:
-            logging.debug(f"Skipping buffer {buffer_name} (built-in type) in {path}:{mapped_line}")
+            logging.debug("Skipping buffer %s (built-in type) in %s:%s", buffer_name, path, mapped_line)
             return True
 
         if is_shader_io_struct(buffer_name):
-            logging.debug(f"Skipping shader IO buffer: {buffer_name} in {path}:{mapped_line}")
+            logging.debug("Skipping shader IO buffer: %s in %s:%s", buffer_name, path, mapped_line)
             return True
         if mapped_line is None:
-            logging.debug(f"Skipping buffer {buffer_name} from include at preprocessed line {mapped_line}")
+            logging.debug("Skipping buffer %s from include at preprocessed line %s", buffer_name, mapped_line)
             return True
         if mapped_line - 1 >= len(original_lines):
             return True
         context_window = 5
         start = max(0, mapped_line - context_window - 1)
         end = min(len(original_lines), mapped_line + context_window)
-        buffer_decl_filter = re.compile(
-            rf"""
-(?:\s*
-    (?:cbuffer|struct)\s+{re.escape(buffer_name)}\s*:\s*register\s*\([butsg]\d+\)
-    |
-    (?:[\w<>]+\s+)?{re.escape(buffer_name)}\s*:\s*register\s*\([butsg]\d+\)
-)
-""",
-            re.IGNORECASE | re.VERBOSE,
-        )
-        for i in range(start, end):
-            line = original_lines[i]
-            if buffer_decl_filter.search(line):
-                return False
-        logging.debug(f"Skipping buffer {buffer_name} in {path}:{mapped_line}")
+        buffer_suffix = buffer_name.lower()
+        for line in original_lines[start:end]:
+            for decl_match in BUFFER_DECL_REGEX.finditer(line):
+                if decl_match.group("name").lower().endswith(buffer_suffix):
+                    return False
+        logging.debug("Skipping buffer %s in %s:%s", buffer_name, path, mapped_line)
         return True
 
     path = os.path.normpath(path).replace("\\", "/")
@@ -533,30 +813,24 @@ def process_file(
         return
 
     try:
-        with open(path, encoding="utf-8", errors="ignore") as file:
-            original_contents = file.read()
+        if original_contents is None:
+            with open(path, encoding="utf-8", errors="ignore") as file:
+                original_contents = file.read()
+
+        # Buffers are only kept when their register(...) declaration appears in this file, so
+        # files without one (most .hlsli headers) can skip the expensive pcpp pass entirely
+        if "register" not in original_contents.lower():
+            logging.debug("Skipping %s: no register declarations", path)
+            return
 
         # Preprocess with pcpp, adding include paths
         preprocessor = pcpp.Preprocessor()
-        include_dirs: list[str] = [
+        # Keep the search order stable while dropping duplicates
+        include_dirs = dict.fromkeys([
             os.path.join(cwd, "package", "Shaders"),
             os.path.dirname(path),
-        ]
-
-        common_dir = os.path.join(cwd, "package", "Shaders", "Common")
-        if os.path.isdir(common_dir):
-            for root, _, _ in os.walk(common_dir):
-                include_dirs.append(root)
-
-        features_dir = os.path.join(cwd, "features")
-        if os.path.isdir(features_dir):
-            for feature_dir in Path(features_dir).glob("*/Shaders"):
-                include_dirs.append(str(feature_dir))
-
-        aio_shaders_dir = os.path.join(cwd, "Shaders")
-        if os.path.isdir(aio_shaders_dir) and "aio" in cwd.lower():
-            include_dirs.append(aio_shaders_dir)
-        include_dirs = list(set(include_dirs))  # remove duplicates
+            *_compute_include_dirs(cwd),
+        ])
 
         for inc_dir in include_dirs:
             preprocessor.add_path(os.path.normpath(inc_dir))
@@ -570,33 +844,19 @@ def process_file(
             contents = io_buffer.getvalue()
 
         # Build line map: preprocessed line -> original line
-        line_map: dict[int, int] = {}
-        preprocessed_line = 0
-        current_file = path
-        current_line = 0
         original_lines = original_contents.splitlines()
-        orig_line_idx = 0
-        for line in contents.splitlines():
-            line_match = re.match(r'^#line\s+(\d+)\s+"([^"]*)"', line)
-            if line_match:
-                current_line = int(line_match.group(1))
-                current_file = line_match.group(2).replace("\\", "/")
-                orig_line_idx = min(current_line - 1, len(original_lines) - 1)
-                continue
-            if current_file == path:
-                line_map[preprocessed_line] = current_line
-                preprocessed_line += 1
-            if current_file == path and orig_line_idx < len(original_lines):
-                if line.strip() == original_lines[orig_line_idx].strip():
-                    current_line = orig_line_idx + 1
-                orig_line_idx += 1
-            current_line += 1
+        line_map = _build_line_map(contents, original_lines, path)
 
         if not line_map:
-            logging.debug(f"Empty line map for {path}, assuming identity mapping")
+            logging.debug("Empty line map for %s, assuming identity mapping", path)
             contents = original_contents
             line_map = {i + 1: i + 1 for i in range(len(contents.splitlines()))}
-        logging.debug(f"Preprocessing {path} with defines: {defines}")
+        logging.debug("Preprocessing %s with defines: %s", path, defines)
+
+        # The define combination is the same for every buffer in this pass
+        define_set = frozenset(defines)
+        define_key = get_define_key(define_set)
+        compilation_unit_key = (short_path.lower(), define_set)
 
         # Process buffers
         capture_list: list[tuple[int, Match[str]]] = finditer_with_line_numbers(
@@ -609,6 +869,8 @@ def process_file(
                 continue
             path_with_line_no = f"{short_path}:{mapped_line}"
             key = f"{path_with_line_no}"  # Consistent key format
+            buffer_type = result.group("buffer_type")
+            reg = sys.intern(f"{buffer_type.lower()}{result.group('buffer_number')}")
             entry = result_map.get(key)
             if not entry:
                 # Extract template information from the full type match
@@ -616,25 +878,22 @@ def process_file(
                 template_type = ""
 
                 # Check for ConstantBuffer<Type> pattern
-                const_buffer_match = re.search(r"ConstantBuffer<(\w+)>", full_type)
+                const_buffer_match = CONSTANT_BUFFER_TEMPLATE_REGEX.search(full_type)
                 if const_buffer_match:
                     template_type = const_buffer_match.group(1)
                 # Check for other template patterns like Texture2D<half2>
                 elif result.group("template_name"):
                     template_type = result.group("template_name")
 
-                # Create a key for this define combination
-                define_key = "_".join(sorted(defines.keys())) if defines else "no_defines"
-
                 entry = {
-                    "Register": f"{result.group('buffer_type').lower()}{result.group('buffer_number')}",
+                    "Register": reg,
                     "Feature": feature,
                     "Type": f"`{full_type}`",
                     "Name": buffer_name,  # This should be the actual buffer variable name
                     "File": f"[{path_with_line_no}]({create_link(short_path, mapped_line)})",
                     "File Path": short_path,  # Store the file path separately
-                    "Register Type": hlsl_types.get(result.group("buffer_type").lower(), "Unknown"),
-                    "Buffer Type": result.group("buffer_type"),
+                    "Register Type": hlsl_types.get(buffer_type.lower(), "Unknown"),
+                    "Buffer Type": buffer_type,
                     "Number": int(result.group("buffer_number")),
                     "PSHADER": False,
                     "VSHADER": False,
@@ -646,19 +905,6 @@ def process_file(
                 }
                 result_map[key] = entry
             # Record this define combination with consistent ordering
-            if defines:
-                # Create consistent define key with standard ordering
-                define_parts = []
-                if "PSHADER" in defines:
-                    define_parts.append("PSHADER")
-                if "VSHADER" in defines:
-                    define_parts.append("VSHADER")
-                if "VR" in defines:
-                    define_parts.append("VR")
-                define_key = "_".join(define_parts) if define_parts else "no_defines"
-            else:
-                define_key = "no_defines"
-
             if "Define Combinations" not in entry:
                 entry["Define Combinations"] = set()
             entry["Define Combinations"].add(define_key)
@@ -666,25 +912,56 @@ def process_file(
             # Update boolean flags
             for define in defines:
                 entry[define] = True
-            if "PSHADER" in defines:
-                entry["PSHADER"] = True
-            if "VSHADER" in defines:
-                entry["VSHADER"] = True
-            if "VR" in defines:
-                entry["VR"] = True
-
-            compilation_unit_key = (short_path.lower(), frozenset(defines.keys()))
-            if compilation_unit_key not in compilation_units:
-                compilation_units[compilation_unit_key] = {}
-            reg = f"{result.group('buffer_type').lower()}{result.group('buffer_number')}"
-            if reg not in compilation_units[compilation_unit_key]:
-                compilation_units[compilation_unit_key][reg] = set()
-            compilation_units[compilation_unit_key][reg].add(feature)
+
+            compilation_units.setdefault(compilation_unit_key, {}).setdefault(reg, set()).add(feature)
 
     except Exception:
         logging.exception("Failed to process file %s", path)
 
 
+def _scan_buffer_file(
+    path: str,
+    cwd: str,
+    defines_list: list[dict[str, str]],
+    shader_pattern: Pattern[str],
+    hlsl_types: dict[str, str],
+    feature: str,
+    short_path: str,
+) -> tuple[dict[str, dict[str, Any]], dict[tuple[str, frozenset[str]], dict[str, set[str]]]]:
+    """Run process_file over every defines combination for one file.
+
+    Kept at module level with its own result maps so it can run in a worker process.
+
+    Returns:
+        A tuple of the file's result map and compilation units.
+    """
+    logging.debug("Processing file: %s", path)
+    result_map: dict[str, dict[str, Any]] = {}
+    compilation_units: dict[tuple[str, frozenset[str]], dict[str, set[str]]] = {}
+
+    # Read the source once for all defines combinations
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as file:
+            original_contents = file.read()
+    except OSError:
+        original_contents = None  # let process_file report the failure
+
+    for defines in defines_list:
+        process_file(
+            path,
+            cwd,
+            defines,
+            shader_pattern,
+            hlsl_types,
+            feature,
+            short_path,
+            result_map,
+            compilation_units,
+            original_contents=original_contents,
+        )
+    return result_map, compilation_units
+
+
 def scan_files(
     cwd: str,
     pattern: Pattern[str],
@@ -692,6 +969,7 @@ def scan_files(
     shader_pattern: Pattern[str],
     hlsl_types: dict[str, str],
     defines_list: list[dict[str, str]],
+    jobs: int = 1,
 ) -> tuple[list[dict[str, Any]], CompilationUnits]:
     """Scan HLSL files for buffer definitions and track compilation units.
 
@@ -702,45 +980,13 @@ def scan_files(
         shader_pattern: Compiled regex pattern for buffer definitions.
         hlsl_types: Mapping of HLSL register types to descriptions.
         defines_list: List of preprocessor define dictionaries.
+        jobs: Number of worker processes used to preprocess files.
 
     Returns:
         tuple[list[dict[str, Any]], CompilationUnits]: A tuple containing the list of buffer entries and compilation units.
     """
-    result_map = {}
-    compilation_units = {}
-    excluded_dirs = get_excluded_dirs(cwd)
-    for root, dirs, files in os.walk(cwd):
-        dirs[:] = [d for d in dirs if d not in excluded_dirs]
-        feature = ""
-        root_normalized = root.replace("\\", "/")
-        feature_match = feature_pattern.search(root_normalized)
-        if feature_match:
-            feature = feature_match.group("feature")
-        for file in files:
-            if file.lower().endswith((".hlsl", ".hlsli")):
-                full_path = os.path.join(root, file).replace("\\", "/")
-                short_path_start = full_path.lower().find("skyrim-community-shaders")
-                short_path = (
-                    full_path[short_path_start + len("skyrim-community-shaders") + 1 :]
-                    if short_path_start != -1
-                    else os.path.relpath(full_path, cwd)
-                )
-                logging.debug(f"Processing file: {full_path}")
-                for defines in defines_list:
-                    process_file(
-                        full_path,
-                        cwd,
-                        defines,
-                        shader_pattern,
-                        hlsl_types,
-                        feature,
-                        short_path,
-                        result_map,
-                        compilation_units,
-                    )
-    results = list(result_map.values())
-    logging.debug(f"Scan found {len(results)} buffers")
-    return results, compilation_units
+    scanner = FileScanner(cwd)
+    return scanner.scan_for_buffers(pattern, feature_pattern, shader_pattern, hlsl_types, defines_list, jobs=jobs)
 
 
 def _format_shader_usage(entry: dict[str, Any]) -> str:
@@ -798,8 +1044,8 @@ def print_buffers_and_conflicts(
     print("<!--")
     print("DEBUG INFORMATION (hidden):")
     # Print any debug information that was collected during analysis
-    for debug_msg in DEBUG_INFO:
-        print(debug_msg)
+    if DEBUG_INFO:
+        print(format_debug_info())
     print("-->")
     print()
     print(f"# Buffer Table (generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
@@ -807,12 +1053,10 @@ def print_buffers_and_conflicts(
     print(table)
 
     if show_conflicts:
-        conflicts: dict[str, list[dict[str, Any]]] = {}
+        conflicts: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
         for (path, defines), registers in compilation_units.items():
             for reg, features in registers.items():
                 if len(features) > 1:
-                    if reg not in conflicts:
-                        conflicts[reg] = []
                     conflicts[reg].append({"path": path, "defines": defines, "features": features})
 
         if conflicts:
@@ -825,33 +1069,30 @@ def print_buffers_and_conflicts(
                     print(f"  **Features**: {', '.join(sorted(str(f) for f in conflict['features']))}")
 
         # Additional analysis: Check for register conflicts within same define context
-        register_conflicts = {}
+        register_conflicts: defaultdict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
         for entry in sorted_results:
             reg = entry.get("Register", "")
             if not reg:
                 continue
 
+            # The summary does not depend on the define combination, so build it once
+            summary = {
+                "name": entry.get("Name", ""),
+                "file": entry.get("File Path", ""),
+                "feature": entry.get("Feature", ""),
+                "type": entry.get("Type", ""),
+            }
             # Group by register and define combination
-            define_combos = entry.get("Define Combinations", set())
-            for combo in define_combos:
-                key = f"{reg}_{combo}"
-                if key not in register_conflicts:
-                    register_conflicts[key] = []
-                register_conflicts[key].append({
-                    "name": entry.get("Name", ""),
-                    "file": entry.get("File Path", ""),
-                    "feature": entry.get("Feature", ""),
-                    "type": entry.get("Type", ""),
-                })
+            for combo in entry.get("Define Combinations", set()):
+                register_conflicts[reg, combo].append(summary)
 
         # Report register conflicts
         true_conflicts = {k: v for k, v in register_conflicts.items() if len(v) > 1}
         if true_conflicts:
             print("\n# Register Conflicts (Same Register + Define Combination)")
-            for key, conflicts in sorted(true_conflicts.items()):
-                reg, combo = key.rsplit("_", 1)
+            for (reg, combo), entries in sorted(true_conflicts.items()):
                 print(f"\n## Register {reg} with defines: {combo.replace('_', ', ')}")
-                for conflict in conflicts:
+                for conflict in entries:
                     print(
                         f"- **{conflict['name']}** ({conflict['type']}) in `{conflict['file']}` - Feature: {conflict['feature']}"
                     )
@@ -862,6 +1103,11 @@ def print_buffers_and_conflicts(
             )
 
 
+def align_up(value: int, alignment: int) -> int:
+    """Round value up to the next multiple of alignment, which must be a power of two."""
+    return (value + alignment - 1) & -alignment
+
+
 def calculate_struct_size(fields: list[FieldDict], align_to_16: bool = False) -> int:
     """Calculate total size of a struct, accounting for alignment.
 
@@ -872,15 +1118,13 @@ def calculate_struct_size(fields: list[FieldDict], align_to_16: bool = False) ->
     Returns:
         int: Total size in bytes.
     """
+    if not align_to_16:
+        return sum(field["size"] for field in fields)
     total_size = 0
     for field in fields:
-        size = field["size"]
-        if align_to_16:
-            # Align each field to 16-byte boundary for cbuffers
-            total_size = (total_size + (ALIGN_TO_16 - 1)) & ~(ALIGN_TO_16 - 1)
-        total_size += size
-    if align_to_16:
-        total_size = (total_size + (ALIGN_TO_16 - 1)) & ~(ALIGN_TO_16 - 1)
+        # Align each field to 16-byte boundary for cbuffers
+        total_size = align_up(total_size, ALIGN_TO_16) + field["size"]
+    total_size = align_up(total_size, ALIGN_TO_16)
     # logging.debug(
     #     f"Calculated struct size: {total_size} bytes for fields: {[(f['name'], f['type'], f['size']) for f in fields]}"
     # )
@@ -902,26 +1146,30 @@ def calculate_hlsl_struct_size(fields: list[FieldDict]) -> int:
         packoffset = field.get("packoffset")
         field_size, _ = get_field_size(field["type"], field.get("array_size", 1))
         if packoffset:
-            match = re.match(r"c(\d+)\.([xyzw])", packoffset)
+            match = PACKOFFSET_REGEX.match(packoffset)
             if match:
                 register = int(match.group(1))
-                component = {"x": 0, "y": 4, "z": 8, "w": 12}[match.group(2)]
+                component = PACKOFFSET_COMPONENT_OFFSETS[match.group(2)]
                 field_offset = register * ALIGN_TO_16 + component
                 offset = max(offset, field_offset)
             else:
                 raise ValueError
         else:
-            offset = (offset + (ALIGN_TO_4 - 1)) & ~(ALIGN_TO_4 - 1)  # Align to 4-byte boundary
+            offset = align_up(offset, ALIGN_TO_4)
         offset += field_size
         max_offset = max(max_offset, offset)
-    return (max_offset + (ALIGN_TO_16 - 1)) & ~(ALIGN_TO_16 - 1)  # Align to 16-byte boundary
+    return align_up(max_offset, ALIGN_TO_16)
 
 
 def clean_body(body: str) -> str:
     """Clean comments and empty lines from struct body."""
-    body = re.sub(r"/\*.*?\*/", "", body, flags=re.DOTALL)
-    lines = body.splitlines()
-    cleaned_lines = [re.sub(r"//.*$", "", line).strip() for line in lines if re.sub(r"//.*$", "", line).strip()]
+    body = BLOCK_COMMENT_REGEX.sub("", body)
+    cleaned_lines: list[str] = []
+    for line in body.splitlines():
+        # Lines without "//" only need stripping; skip the regex for them
+        stripped = (LINE_COMMENT_REGEX.sub("", line) if "//" in line else line).strip()
+        if stripped:
+            cleaned_lines.append(stripped)
     return "\n".join(cleaned_lines)
 
 
@@ -929,28 +1177,42 @@ def parse_field(field: str, struct_name: str, is_hlsl: bool) -> FieldDict | None
     field = field.strip()
     if not field:
         return None
-    if is_hlsl:
-        field_match = re.match(
-            r"(?:(?:row|column)_major\s+)?(?P<type>[\w:]+(?:<\w+>)?(?:\w+)?)\s+(?P<name>\w+)(?:\s*:\s*packoffset\((?P<packoffset>[^)]+)\))?(?:\s*\[(?P<array>\d+(?:\]\[\d+)?)\])?",
-            field,
-        )
-    else:
-        field_match = re.match(
-            r"(?P<type>[\w:]+(?:\w+)?(?:<\w+>)?\s*\*?)\s+(?P<name>\w+)(?:\s*\[(?P<array>\d+(?:\]\[\d+)?)\])?",
-            field,
-        )
+    field_match = (HLSL_FIELD_REGEX if is_hlsl else CPP_FIELD_REGEX).match(field)
     if not field_match:
-        logging.debug(f"Failed to parse {'HLSL' if is_hlsl else 'C++'} field in {struct_name}: {field}")
+        logging.debug("Failed to parse %s field in %s: %s", "HLSL" if is_hlsl else "C++", struct_name, field)
         return None
-    field_type = field_match.group("type")
+    return _field_from_match(field_match, is_hlsl)
+
+
+def _field_statements(body: str, is_hlsl: bool) -> list[Match[str]]:
+    """Split a cleaned struct body into its non-empty ;-terminated statements.
+
+    Each statement is matched against the field pattern as part of the same
+    scan, so the ``field`` group is set only for statements that parse as a
+    field. Equivalent to calling parse_field on every part of ``body.split(";")``.
+
+    Args:
+        body: Struct body with comments removed.
+        is_hlsl: Whether to use the HLSL (True) or C++ (False) field pattern.
+
+    Returns:
+        list[Match[str]]: One match per statement.
+    """
+    regex = HLSL_FIELD_STATEMENT_REGEX if is_hlsl else CPP_FIELD_STATEMENT_REGEX
+    return [m for m in regex.finditer(body) if m.group("field") or m.group("rest")]
+
+
+def _field_from_match(field_match: Match[str], is_hlsl: bool) -> FieldDict:
+    """Build a field dictionary from a field pattern match.
+
+    Names and types recur across many structs and are used as keys of the
+    memoized similarity helpers, so they are interned once here.
+    """
+    field_type = sys.intern(field_match.group("type"))
     field_name = field_match.group("name")
-    array_size = 1
-    if field_match.group("array"):
-        dims = [int(dim) for dim in re.findall(r"\d+", field_match.group("array"))]
-        array_size = 1
-        for dim in dims:
-            array_size *= dim
-    display_name = f"{field_name}[{array_size}]" if array_size > 1 else field_name
+    dim1, dim2 = field_match.group("dim1", "dim2")
+    array_size = int(dim1) * int(dim2) if dim2 else int(dim1) if dim1 else 1
+    display_name = sys.intern(f"{field_name}[{array_size}]" if array_size > 1 else field_name)
     field_size, is_unknown = get_field_size(field_type, array_size)
     result: FieldDict = {
         "name": display_name,
@@ -965,30 +1227,34 @@ def parse_field(field: str, struct_name: str, is_hlsl: bool) -> FieldDict | None
 
 
 def is_shader_io_struct(name: str) -> bool:
-    name_upper = name.upper()
-    return name_upper.endswith("_INPUT") or name_upper.endswith("_OUTPUT")
+    return name.upper().endswith(SHADER_IO_SUFFIXES)
 
 
 def extract_hlsl_structs(content: str, file_path: str) -> dict[str, dict]:
     """Extract HLSL structs, cbuffers, ConstantBuffers, and template buffers."""
     structs = {}
-    struct_pattern = r"(struct|cbuffer|ConstantBuffer<(?P<template>\w+)>)\s+(?P<name>\w+)\s*(?::\s*register\s*\(\w\d+\s*\))?\s*{(?P<body>[^{}]*?)}"
-    template_pattern = (
-        r"(?:RW)?(?:StructuredBuffer)<(?P<template>\w+)>\s+(?P<name>\w+)\s*:\s*register\s*\([a-z]\d+\s*\)"
-    )
-    content_clean = preprocess_content(content, {})
-    content_clean = clean_body(content_clean)
+    template_matches: list[tuple[int, re.Match]] = []
 
     # Extract structs, cbuffers, and ConstantBuffers
-    for line_number, match in finditer_with_line_numbers(struct_pattern, content, re.MULTILINE | re.DOTALL):
-        name = match.group("name")
+    for line_number, match in finditer_with_line_numbers(HLSL_DECLARATION_REGEX, content):
+        if match.group("buffer_name") is not None:
+            # Template buffers are resolved once every real definition is known
+            template_matches.append((line_number, match))
+            continue
+        name = sys.intern(match.group("name"))
         if name.lower() in BASE_TYPE_SIZES:
-            logging.debug(f"Skipping struct/buffer {name} (built-in type) in {file_path}:{line_number}")
+            logging.debug("Skipping struct/buffer %s (built-in type) in %s:%s", name, file_path, line_number)
             continue
         body = clean_body(match.group("body").strip())
         is_cbuffer = match.group(1) == "cbuffer"
-        is_constant_buffer = match.group(1).startswith("ConstantBuffer")
-        fields = [f for field in body.split(";") if (f := parse_field(field, name, True))]
+        # Only the ConstantBuffer<T> form captures a template type
+        is_constant_buffer = match.group("template") is not None
+        fields: list[FieldDict] = []
+        for statement in _field_statements(body, True):
+            if statement.group("field"):
+                fields.append(_field_from_match(statement, True))
+            else:
+                logging.debug("Failed to parse HLSL field in %s: %s", name, statement.group("rest").strip())
         size = calculate_struct_size(fields, align_to_16=is_cbuffer or is_constant_buffer)
         structs[name] = {
             "fields": fields,
@@ -1000,17 +1266,23 @@ def extract_hlsl_structs(content: str, file_path: str) -> dict[str, dict]:
             "size": size,
         }
         logging.debug(
-            f"Found HLSL {'cbuffer' if is_cbuffer else 'ConstantBuffer' if is_constant_buffer else 'struct'} {name} in {file_path}:{line_number} with {len(fields)} fields, total size: {size} bytes"
+            "Found HLSL %s %s in %s:%s with %s fields, total size: %s bytes",
+            "cbuffer" if is_cbuffer else "ConstantBuffer" if is_constant_buffer else "struct",
+            name,
+            file_path,
+            line_number,
+            len(fields),
+            size,
         )
 
-    # Second pass: extract and process template buffers
-    for line_number, match in finditer_with_line_numbers(template_pattern, content, re.MULTILINE):
-        template_type = match.group("template")
-        template_name = match.group("name")
+    # Second pass: process template buffers
+    for line_number, match in template_matches:
+        template_type = match.group("buffer_template")
+        template_name = match.group("buffer_name")
 
         # Skip if template type is a base type
         if template_type in BASE_TYPE_SIZES:
-            logging.debug(f"Skipping base type template {template_type} in {file_path}:{line_number}")
+            logging.debug("Skipping base type template %s in %s:%s", template_type, file_path, line_number)
             continue
 
         # Only add template type if we don't already have a real definition
@@ -1022,17 +1294,19 @@ def extract_hlsl_structs(content: str, file_path: str) -> dict[str, dict]:
                 "is_cbuffer": False,
                 "is_template": True,
             }
-            logging.debug(f"Found template struct {template_type} in {file_path}:{line_number}")
+            logging.debug("Found template struct %s in %s:%s", template_type, file_path, line_number)
         else:
             # Check if existing definition has actual fields (real struct vs empty template)
             existing_struct = structs[template_type]
             if existing_struct.get("fields") and not existing_struct.get("is_template", False):
                 logging.debug(
-                    f"Skipping template {template_type} - real struct definition already exists with {len(existing_struct['fields'])} fields"
+                    "Skipping template %s - real struct definition already exists with %s fields",
+                    template_type,
+                    len(existing_struct["fields"]),
                 )
                 continue
             else:
-                logging.debug(f"Template {template_type} found but existing definition is also a template or empty")
+                logging.debug("Template %s found but existing definition is also a template or empty", template_type)
 
         # Also add the instance as its own entry (only if not already exists)
         if template_name not in structs:
@@ -1059,49 +1333,41 @@ def extract_cpp_structs(content: str, file_path: str) -> dict[str, dict]:
         dict[str, dict]: Dictionary of struct names to their metadata.
     """
     structs = {}
-    struct_pattern = r"struct\s+(?:alignas\(\d+\)\s+)?(?P<name>\w+)\s*{(?P<body>[^{}]*?)}"
 
-    for line_number, match in finditer_with_line_numbers(struct_pattern, content, re.MULTILINE | re.DOTALL):
-        name = match.group("name")
+    for line_number, match in finditer_with_line_numbers(CPP_STRUCT_REGEX, content):
+        name = sys.intern(match.group("name"))
         if name.lower() in BASE_TYPE_SIZES:
-            logging.debug(f"Skipping struct/buffer {name} (built-in type) in {file_path}:{line_number}")
+            logging.debug("Skipping struct/buffer %s (built-in type) in %s:%s", name, file_path, line_number)
             continue
 
         body = clean_body(match.group("body").strip())
 
-        # Parse all fields, including static ones
-        all_fields = []
         non_static_fields = []
 
-        for field_line in body.split(";"):
-            field_line = field_line.strip()
-            if not field_line:
-                continue
-
+        for statement in _field_statements(body, False):
             # Check if this is a static declaration
-            is_static = field_line.startswith("static ")
-
-            if is_static:
-                logging.debug(f"Skipping static member in {name}: {field_line}")
+            if statement.group("static"):
+                logging.debug("Skipping static member in %s: %s", name, statement.group(0).strip(" \t\n;"))
                 continue
 
             # Parse non-static field
-            parsed_field = parse_field(field_line, name, False)
-            if parsed_field:
-                all_fields.append(parsed_field)
-                non_static_fields.append(parsed_field)
+            if statement.group("field"):
+                non_static_fields.append(_field_from_match(statement, False))
+            else:
+                logging.debug("Failed to parse C++ field in %s: %s", name, statement.group("rest").strip())
 
         # Skip struct if it has no non-static fields
         if not non_static_fields:
-            logging.debug(f"Skipping C++ struct {name} in {file_path}:{line_number + 1} (no non-static fields)")
+            logging.debug("Skipping C++ struct %s in %s:%s (no non-static fields)", name, file_path, line_number + 1)
             continue
 
         # Skip struct if any non-static field contains a pointer
         if any("*" in field["type"] for field in non_static_fields):
-            logging.debug(f"Skipping C++ struct {name} in {file_path}:{line_number + 1} (contains pointers)")
+            logging.debug("Skipping C++ struct %s in %s:%s (contains pointers)", name, file_path, line_number + 1)
             continue
 
         adjusted_line = line_number + 1
+        size = calculate_struct_size(non_static_fields)
         structs[name] = {
             "fields": non_static_fields,  # Only store non-static fields
             "file": file_path,
@@ -1109,11 +1375,18 @@ def extract_cpp_structs(content: str, file_path: str) -> dict[str, dict]:
             "is_cbuffer": False,
             "is_template": False,
             "body": body,  # Store raw body for alignment check
+            "size": size,
         }
-        size = calculate_struct_size(non_static_fields)
-        logging.debug(
-            f"Found C++ struct {name} in {file_path}:{adjusted_line} with {len(non_static_fields)} non-static fields: {[(f['name'], f['type'], f['size']) for f in non_static_fields]}, total size: {size} bytes"
-        )
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "Found C++ struct %s in %s:%s with %s non-static fields: %s, total size: %s bytes",
+                name,
+                file_path,
+                adjusted_line,
+                len(non_static_fields),
+                [(f["name"], f["type"], f["size"]) for f in non_static_fields],
+                size,
+            )
 
     return structs
 
@@ -1129,7 +1402,7 @@ def extract_structs(content: str, is_hlsl: bool, file_path: str) -> dict[str, di
     Returns:
         dict[str, dict]: Dictionary of struct names to their metadata.
     """
-    logging.debug(f"Extracting structs from {file_path}")
+    logging.debug("Extracting structs from %s", file_path)
     return extract_hlsl_structs(content, file_path) if is_hlsl else extract_cpp_structs(content, file_path)
 
 
@@ -1142,13 +1415,7 @@ def get_struct_signature(fields: list[dict]) -> str:
     Returns:
         str: Struct signature string.
     """
-    signature = []
-    for field in fields:
-        norm_type = normalize_field_type(field["type"])
-        size = field["size"]
-        signature.append(f"{norm_type}:{field['name']}:{size}")
-    sig_str = ";".join(signature)
-    return sig_str
+    return ";".join([f"{normalize_field_type(field['type'])}:{field['name']}:{field['size']}" for field in fields])
 
 
 BASE_TYPE_SIZES = {
@@ -1165,7 +1432,21 @@ BASE_TYPE_SIZES = {
     "bool": 4,
 }
 
+# HLSL vector types and the equivalent C++ array spelling
+HLSL_VECTOR_TO_CPP_ARRAY = {
+    "float2": "float[2]",
+    "float3": "float[3]",
+    "float4": "float[4]",
+    "int2": "int[2]",
+    "int3": "int[3]",
+    "int4": "int[4]",
+    "uint2": "uint[2]",
+    "uint3": "uint[3]",
+    "uint4": "uint[4]",
+}
+
 
+@functools.lru_cache(maxsize=4096)
 def parse_type_with_array(field_type: str) -> tuple[str, int]:
     """
     Parse field type and extract array size if present.
@@ -1176,12 +1457,13 @@ def parse_type_with_array(field_type: str) -> tuple[str, int]:
     Returns:
         tuple[str, int]: A tuple containing the base type and array size (default 1).
     """
-    match = re.match(r"(.+?)\[(\d+)\]$", field_type)
+    match = ARRAY_TYPE_REGEX.match(field_type)
     if match:
         return match.group(1), int(match.group(2))
     return field_type, 1
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_matrix_size(field_type: str) -> tuple[int, int] | None:
     """
     Extract matrix dimensions from names like XMFLOAT3X4.
@@ -1192,12 +1474,13 @@ def extract_matrix_size(field_type: str) -> tuple[int, int] | None:
     Returns:
         tuple[int, int] | None: (rows, columns) if matched, else None.
     """
-    match = re.search(r"FLOAT(\d)X(\d)", field_type.upper())
+    match = XM_MATRIX_REGEX.search(field_type.upper())
     if match:
         return int(match.group(1)), int(match.group(2))
     return None
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_field_type(field_type: str) -> str:
     """
     Normalize a field type string to a canonical HLSL-like form (e.g., float4x4).
@@ -1208,6 +1491,10 @@ def normalize_field_type(field_type: str) -> str:
     Returns:
         str: Normalized type, e.g., 'float4x4' or 'float3'.
     """
+    # Bare base types are already normalized
+    if field_type in BASE_TYPE_SIZES:
+        return field_type
+
     base_type, _ = parse_type_with_array(field_type)
 
     # Handle XMFLOAT matrix types
@@ -1220,6 +1507,7 @@ def normalize_field_type(field_type: str) -> str:
     return base_type.split("::")[-1].lower()
 
 
+@functools.lru_cache(maxsize=4096)
 def get_field_size(field_type: str, array_size: int = 1) -> tuple[int, bool]:
     """Calculate the size in bytes of a field based on its type and array size.
 
@@ -1232,6 +1520,12 @@ def get_field_size(field_type: str, array_size: int = 1) -> tuple[int, bool]:
         - The size in bytes
         - A flag indicating if the type is unknown (True) or recognized (False)
     """
+    # Bare base types need no parsing
+    if field_type in BASE_TYPE_SIZES:
+        return BASE_TYPE_SIZES[field_type] * array_size, False
+
+    # parse_type_with_array and normalize_field_type are memoized, since the same
+    # handful of type strings is seen for every field of every struct
     base_type, parsed_array_size = parse_type_with_array(field_type)
     array_size *= parsed_array_size
 
@@ -1241,7 +1535,7 @@ def get_field_size(field_type: str, array_size: int = 1) -> tuple[int, bool]:
     norm_type = normalize_field_type(base_type)
 
     # Handle floatNxM matrix
-    if match := re.match(r"float(\d)x(\d)", norm_type):
+    if match := FLOAT_MATRIX_REGEX.match(norm_type):
         rows, cols = int(match.group(1)), int(match.group(2))
         return 4 * rows * cols * array_size, False  # 4 bytes per float
 
@@ -1259,19 +1553,27 @@ def is_padding_field(field: dict) -> bool:
     Returns:
         bool: True if the field is a padding field.
     """
-    name = field["name"].lower()
+    return _is_padding_name(field["name"])
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_padding_name(name: str) -> bool:
+    """Check if a field name marks padding; memoized since field names recur across structs."""
     # Remove array size from name for comparison
-    base_name = name.split("[")[0] if "[" in name else name
-    return (
-        base_name == "pad"
-        or base_name.startswith("_pad")
-        or base_name.startswith("pad")
-        or base_name.endswith("pad")
-        or base_name.startswith("padding")
-        or base_name.endswith("padding")
-        or base_name.startswith("_padding")
-        or base_name.endswith("_padding")
-    )
+    base_name = name.partition("[")[0].lower()
+    return base_name.startswith(PADDING_PREFIXES) or base_name.endswith(PADDING_SUFFIXES)
+
+
+def count_non_padding_fields(fields: list[FieldDict]) -> int:
+    """Count the fields that are not padding.
+
+    Args:
+        fields: List of field dictionaries.
+
+    Returns:
+        int: Number of fields for which is_padding_field is False.
+    """
+    return sum(1 for field in fields if not _is_padding_name(field["name"]))
 
 
 def are_fields_equivalent(cpp_field: dict, hlsl_field: dict) -> bool:
@@ -1298,24 +1600,11 @@ def are_fields_equivalent(cpp_field: dict, hlsl_field: dict) -> bool:
 
 def normalize_array_types(hlsl_type: str, cpp_type: str) -> tuple[str, str]:
     """Normalize HLSL vector types and C++ array types for comparison."""
-    # HLSL vector to C++ array mapping
-    hlsl_to_cpp = {
-        "float2": "float[2]",
-        "float3": "float[3]",
-        "float4": "float[4]",
-        "int2": "int[2]",
-        "int3": "int[3]",
-        "int4": "int[4]",
-        "uint2": "uint[2]",
-        "uint3": "uint[3]",
-        "uint4": "uint[4]",
-    }
-
     # Normalize HLSL type to equivalent C++ array
-    normalized_hlsl = hlsl_to_cpp.get(hlsl_type, hlsl_type)
+    normalized_hlsl = HLSL_VECTOR_TO_CPP_ARRAY.get(hlsl_type, hlsl_type)
 
     # Extract base type and size from C++ array notation
-    cpp_array_match = re.match(r"(\w+)\[(\d+)\]", cpp_type)
+    cpp_array_match = CPP_ARRAY_TYPE_REGEX.match(cpp_type)
     if cpp_array_match:
         base_type, size = cpp_array_match.groups()
         normalized_cpp = f"{base_type}[{size}]"
@@ -1325,6 +1614,31 @@ def normalize_array_types(hlsl_type: str, cpp_type: str) -> tuple[str, str]:
     return normalized_hlsl, normalized_cpp
 
 
+@functools.lru_cache(maxsize=4096)
+def compute_type_similarity(hlsl_type: str, cpp_type: str) -> float:
+    """Compute type similarity, treating HLSL vectors and C++ arrays as equivalent.
+
+    Results are memoized since only a handful of distinct type pairs occur
+    across all the fields that are compared.
+
+    Args:
+        hlsl_type: HLSL field type
+        cpp_type: C++ field type
+
+    Returns:
+        float: 1.0 for equivalent types, the Jaro-Winkler similarity if at least 0.7, otherwise 0.0
+    """
+    # Normalize types for comparison
+    hlsl_norm, cpp_norm = normalize_array_types(hlsl_type, cpp_type)
+
+    # Check for exact type match after normalization
+    if hlsl_norm == cpp_norm:
+        return 1.0
+
+    # Fall back to string similarity for types that don't normalize; scores below the cutoff are returned as 0.0
+    return JaroWinkler.normalized_similarity(hlsl_type, cpp_type, score_cutoff=0.7)
+
+
 def get_field_similarity(cpp_field: dict, hlsl_field: dict) -> tuple[float, float, bool]:
     """Enhanced field similarity that handles array type equivalence.
 
@@ -1341,17 +1655,7 @@ def get_field_similarity(cpp_field: dict, hlsl_field: dict) -> tuple[float, floa
     # Use compute_name_similarity which handles array notation internally
     name_sim = compute_name_similarity(hlsl_field["name"], cpp_field["name"])
 
-    # Normalize types for comparison
-    hlsl_norm, cpp_norm = normalize_array_types(hlsl_field["type"], cpp_field["type"])
-
-    # Check for exact type match after normalization
-    if hlsl_norm == cpp_norm:
-        type_sim = 1.0
-    else:
-        # Fall back to string similarity for types that don't normalize
-        type_sim = jellyfish.jaro_winkler_similarity(hlsl_field["type"], cpp_field["type"])
-        if type_sim < 0.7:
-            type_sim = 0.0
+    type_sim = compute_type_similarity(hlsl_field["type"], cpp_field["type"])
 
     # Direct size comparison
     size_match = cpp_field["size"] == hlsl_field["size"]
@@ -1387,6 +1691,10 @@ def compute_struct_alignment(
     cpp_fields = cpp_data.get("fields", [])
     hlsl_fields = hlsl_data.get("fields", [])
 
+    # Sizes and field counts an order of magnitude apart can never be accepted; skip the fuzzy LCS
+    if report := _size_mismatch_report(cpp_fields, hlsl_fields):
+        return 0.0, [], report
+
     # Use existing helper functions for field matching
     align_matches, report = _compute_alignment_report(cpp_fields, hlsl_fields, cpp_data, hlsl_data, struct_name_weight)
 
@@ -1394,6 +1702,50 @@ def compute_struct_alignment(
     return score, align_matches, report
 
 
+def _size_mismatch_report(cpp_fields: list[FieldDict], hlsl_fields: list[FieldDict]) -> dict[str, Any] | None:
+    """Build a zero-score report for struct pairs that differ too much in size and field count.
+
+    Such pairs always fail the field count check in ``_is_match_good_enough``,
+    so the field alignment is skipped and every field is reported as unmatched.
+
+    Args:
+        cpp_fields: List of C++ fields.
+        hlsl_fields: List of HLSL fields.
+
+    Returns:
+        dict[str, Any] | None: The report, or None if the pair should be aligned normally.
+    """
+    cpp_total_fields = count_non_padding_fields(cpp_fields)
+    total_fields = count_non_padding_fields(hlsl_fields)
+    if min(cpp_total_fields, total_fields) * FIELD_COUNT_MISMATCH_RATIO >= max(cpp_total_fields, total_fields):
+        return None
+    cpp_total_size = calculate_struct_size(cpp_fields)
+    hlsl_total_size = calculate_struct_size(hlsl_fields)
+    if min(cpp_total_size, hlsl_total_size) >= SIZE_MISMATCH_RATIO * max(cpp_total_size, hlsl_total_size):
+        return None
+    unmatched_count = len(hlsl_fields) + len(cpp_fields)
+    return {
+        "name_sim": 0.0,
+        "type_sim": 0.0,
+        "size_sim": 0.0,
+        "exact_matches": 0,
+        "high_sim_matches": 0,
+        "total_fields": total_fields,
+        "missing_fields": total_fields,
+        "score": 0.0,
+        "cpp_total_fields": cpp_total_fields,
+        "field_diff_count": unmatched_count,
+        "field_name_diff_count": unmatched_count,
+        "field_type_diff_count": unmatched_count,
+        "field_matches": 0,
+        "unmatched_hlsl_fields": [f["name"] for f in hlsl_fields],
+        "unmatched_cpp_fields": [f["name"] for f in cpp_fields],
+        "size_difference": abs(cpp_total_size - hlsl_total_size),
+        "field_names_hlsl": [f["name"] for f in hlsl_fields],
+        "field_names_cpp": [f["name"] for f in cpp_fields],
+    }
+
+
 def compute_match_score(
     hlsl_name: str,
     cpp_name: str,
@@ -1436,6 +1788,30 @@ def compute_match_score(
     return name_sim * struct_name_weight + field_match_score * (1 - struct_name_weight) * order_score
 
 
+def _fields_size(struct_data: dict[str, Any], fields: list[FieldDict]) -> int:
+    """Get the unaligned size of fields, reusing the size stored on the struct when it matches.
+
+    cbuffer and ConstantBuffer sizes are stored 16-byte aligned, and the stored
+    size only describes the struct's own field list, so anything else is recomputed.
+
+    Args:
+        struct_data: Struct metadata that fields were taken from.
+        fields: List of field dictionaries.
+
+    Returns:
+        int: Total size in bytes without 16-byte alignment.
+    """
+    size = struct_data.get("size")
+    if (
+        size is None
+        or struct_data.get("fields") is not fields
+        or struct_data.get("is_cbuffer")
+        or struct_data.get("is_constant_buffer")
+    ):
+        return calculate_struct_size(fields)
+    return size
+
+
 def _compute_alignment_report(
     cpp_fields: list[FieldDict],
     hlsl_fields: list[FieldDict],
@@ -1492,12 +1868,19 @@ def _compute_alignment_report(
         else:
             i += 1
             j += 1
-    report["missing_fields"] = len([
-        f for f in hlsl_fields if not is_padding_field(f) and f not in [m[0] for m in align_matches if m[0]]
-    ])
-    report["total_fields"] = len([f for f in hlsl_fields if not is_padding_field(f)])
-    cpp_total_size = calculate_struct_size(cpp_fields)
-    hlsl_total_size = calculate_struct_size(hlsl_fields)
+    # Field dicts are unhashable, so track the aligned HLSL fields by identity
+    aligned_hlsl_ids = {id(f) for f, _ in align_matches if f}
+    total_hlsl_fields = 0
+    missing_fields = 0
+    for f in hlsl_fields:
+        if not is_padding_field(f):
+            total_hlsl_fields += 1
+            if id(f) not in aligned_hlsl_ids:
+                missing_fields += 1
+    report["missing_fields"] = missing_fields
+    report["total_fields"] = total_hlsl_fields
+    cpp_total_size = _fields_size(cpp_data, cpp_fields)
+    hlsl_total_size = _fields_size(hlsl_data, hlsl_fields)
     size_ratio = (
         min(cpp_total_size, hlsl_total_size) / max(cpp_total_size, hlsl_total_size)
         if cpp_total_size > 0 and hlsl_total_size > 0
@@ -1530,14 +1913,24 @@ def _compute_alignment_report(
         + report["type_sim"] * 0.2
         + report["size_sim"] * 0.2
     )
-    report["cpp_total_fields"] = len([f for f in cpp_fields if not is_padding_field(f)])
+    report["cpp_total_fields"] = count_non_padding_fields(cpp_fields)
     total_diff, name_diff, type_diff = count_field_differences(align_matches)
     report["field_diff_count"] = total_diff
     report["field_name_diff_count"] = name_diff
     report["field_type_diff_count"] = type_diff
-    report["field_matches"] = len([m for m in align_matches if m[0] and m[1]])
-    report["unmatched_hlsl_fields"] = [f["name"] for f, c in align_matches if f and not c]
-    report["unmatched_cpp_fields"] = [c["name"] for f, c in align_matches if c and not f]
+    field_matches = 0
+    unmatched_hlsl_fields: list[str] = []
+    unmatched_cpp_fields: list[str] = []
+    for f, c in align_matches:
+        if f and c:
+            field_matches += 1
+        elif f:
+            unmatched_hlsl_fields.append(f["name"])
+        elif c:
+            unmatched_cpp_fields.append(c["name"])
+    report["field_matches"] = field_matches
+    report["unmatched_hlsl_fields"] = unmatched_hlsl_fields
+    report["unmatched_cpp_fields"] = unmatched_cpp_fields
     report["size_difference"] = abs(cpp_total_size - hlsl_total_size)
     report["field_names_hlsl"] = [f["name"] for f in hlsl_fields]
     report["field_names_cpp"] = [f["name"] for f in cpp_fields]
@@ -1556,7 +1949,7 @@ def fuzzy_lcs(
     cpp_fields: list[dict],
     name_sim_threshold: float = NAME_SIM_THRESHOLD,
 ) -> list[tuple[int, int]]:
-    """Fuzzy sequence matching using difflib for field alignment.
+    """Fuzzy sequence matching of field names for field alignment.
 
     Args:
         hlsl_fields: List of HLSL field dictionaries
@@ -1568,17 +1961,25 @@ def fuzzy_lcs(
     """
     matches = []
     used_cpp_indices = set()
+    # Pull the names out of the field dicts once; the pairwise loop only needs the names
+    hlsl_names = [hlsl_field["name"] for hlsl_field in hlsl_fields]
+    cpp_names = [cpp_field["name"] for cpp_field in cpp_fields]
+    cpp_keys = [_name_similarity_key(cpp_name) for cpp_name in cpp_names]
 
     # For each HLSL field, find its best C++ match
-    for i, hlsl_field in enumerate(hlsl_fields):
+    for i, hlsl_name in enumerate(hlsl_names):
         best_match_idx = -1
         best_similarity = 0.0
+        hlsl_key = _name_similarity_key(hlsl_name)
 
-        for j, cpp_field in enumerate(cpp_fields):
+        for j, cpp_name in enumerate(cpp_names):
             if j in used_cpp_indices:
                 continue
+            # Most pairs are too different in length to reach the threshold; skip scoring them
+            if _name_similarity_upper_bound(hlsl_key, cpp_keys[j]) < name_sim_threshold:
+                continue
 
-            sim = compute_name_similarity(hlsl_field["name"], cpp_field["name"])
+            sim = compute_name_similarity(hlsl_name, cpp_name)
 
             if sim >= name_sim_threshold and sim > best_similarity:
                 best_similarity = sim
@@ -1589,23 +1990,80 @@ def fuzzy_lcs(
             matches.append((i, best_match_idx))
             used_cpp_indices.add(best_match_idx)
             # logging.debug(
-            #     f"  Match found ({i},{best_match_idx}): {hlsl_field['name']} <-> {cpp_fields[best_match_idx]['name']} (sim: {best_similarity:.3f})"
+            #     f"  Match found ({i},{best_match_idx}): {hlsl_name} <-> {cpp_names[best_match_idx]} (sim: {best_similarity:.3f})"
             # )
 
     return matches
 
 
+@functools.lru_cache(maxsize=65536)
 def strip_array_notation(name: str) -> str:
     """Remove any array notation from a field name, e.g., 'pad[3]' -> 'pad'."""
-    return re.sub(r"\[.*?\]$", "", name)
+    return ARRAY_SUFFIX_REGEX.sub("", name)
 
 
 def emphasize_if(condition: bool, value: str) -> str:
     return f"<ins>**_{value}_**</ins>" if condition and value else value
 
 
+@functools.lru_cache(maxsize=65536)
+def _name_similarity_key(name: str) -> tuple[str, str]:
+    """Return the lowercased and array-stripped forms of a name used by compute_name_similarity."""
+    name_lower = name.lower()
+    return name_lower, strip_array_notation(name_lower)
+
+
+def _name_similarity_upper_bound(a: tuple[str, str], b: tuple[str, str]) -> float:
+    """Cheap upper bound on compute_name_similarity for two names.
+
+    Substring relationships can score highly regardless of length, so those
+    return 1.0. Otherwise the score comes from the longest common subsequence,
+    which has at most as many characters as the shorter name has.
+
+    Args:
+        a: _name_similarity_key of the first name.
+        b: _name_similarity_key of the second name.
+
+    Returns:
+        float: A value no lower than compute_name_similarity for the names.
+    """
+    a_lower, a_stripped = a
+    b_lower, b_stripped = b
+    if a_stripped in b_stripped or b_stripped in a_stripped:
+        return 1.0
+    len_a, len_b = len(a_lower), len(b_lower)
+    stripped_a, stripped_b = len(a_stripped), len(b_stripped)
+    return max(
+        2.0 * min(len_a, len_b) / (len_a + len_b),
+        2.0 * min(stripped_a, stripped_b) / (stripped_a + stripped_b),
+    )
+
+
+def _sequence_similarity(a: str, b: str) -> tuple[float, float]:
+    """Compute the ratio and LCS-based similarity for two strings.
+
+    Both scores come from one RapidFuzz longest common subsequence length.
+
+    Args:
+        a: First string.
+        b: Second string.
+
+    Returns:
+        tuple[float, float]: (ratio, matched characters / length of the longer string).
+    """
+    lcs_length = LCSseq.similarity(a, b)
+    total_length = len(a) + len(b)
+    ratio = 2.0 * lcs_length / total_length if total_length else 1.0
+    max_length = max(len(a), len(b))
+    return ratio, lcs_length / max_length if max_length > 0 else 0.0
+
+
+@functools.lru_cache(maxsize=65536)
 def compute_name_similarity(hlsl_field_name: str, cpp_field_name: str) -> float:
-    """Compute name similarity using difflib and handle array notation.
+    """Compute name similarity from the longest common subsequence and handle array notation.
+
+    Results are memoized since the same field names recur across every
+    struct pairing that is scored.
 
     Args:
         hlsl_field_name: HLSL field name
@@ -1618,27 +2076,21 @@ def compute_name_similarity(hlsl_field_name: str, cpp_field_name: str) -> float:
     hlsl_name_lower = hlsl_field_name.lower()
     cpp_name_lower = cpp_field_name.lower()
 
-    # Try direct sequence matching first
-    matcher = difflib.SequenceMatcher(None, hlsl_name_lower, cpp_name_lower)
-    normal_sim = matcher.ratio()
+    # Identical names always score 1.0; skip the sequence matching
+    if hlsl_name_lower == cpp_name_lower:
+        return 1.0
 
-    # Enhanced: Also get LCS-based similarity
-    matching_blocks = matcher.get_matching_blocks()
-    lcs_length = sum(size for _, _, size in matching_blocks[:-1])  # Exclude final dummy block
-    max_length = max(len(hlsl_name_lower), len(cpp_name_lower))
-    lcs_sim = lcs_length / max_length if max_length > 0 else 0.0
+    # Try direct sequence matching first (ratio and LCS both come from one RapidFuzz LCSseq length)
+    normal_sim, lcs_sim = _sequence_similarity(hlsl_name_lower, cpp_name_lower)
 
     # Try with array notation stripped (preserving existing logic)
     hlsl_stripped = strip_array_notation(hlsl_name_lower)
     cpp_stripped = strip_array_notation(cpp_name_lower)
-    stripped_matcher = difflib.SequenceMatcher(None, hlsl_stripped, cpp_stripped)
-    stripped_sim = stripped_matcher.ratio()
-
-    # Enhanced: LCS similarity for stripped names too
-    stripped_blocks = stripped_matcher.get_matching_blocks()
-    stripped_lcs_length = sum(size for _, _, size in stripped_blocks[:-1])
-    stripped_max_length = max(len(hlsl_stripped), len(cpp_stripped))
-    stripped_lcs_sim = stripped_lcs_length / stripped_max_length if stripped_max_length > 0 else 0.0
+    if hlsl_stripped == hlsl_name_lower and cpp_stripped == cpp_name_lower:
+        # No array notation, so the stripped comparison would repeat the one above
+        stripped_sim, stripped_lcs_sim = normal_sim, lcs_sim
+    else:
+        stripped_sim, stripped_lcs_sim = _sequence_similarity(hlsl_stripped, cpp_stripped)
 
     # Look for substring relationships (preserving existing logic)
     if hlsl_stripped in cpp_stripped or cpp_stripped in hlsl_stripped:
@@ -1662,6 +2114,24 @@ def compute_name_similarity(hlsl_field_name: str, cpp_field_name: str) -> float:
     return best_score
 
 
+def render_markdown_table(rows: list[dict[str, str]]) -> str:
+    """Render rows as a markdown table, using the keys of the first row as headers.
+
+    Cells are not padded to a common width, which keeps this cheap for the many
+    small per-struct tables; the rendered markdown is the same.
+
+    Args:
+        rows: Non-empty list of rows mapping header to cell text.
+
+    Returns:
+        str: The table, without a trailing newline.
+    """
+    headers = list(rows[0])
+    lines = [f"| {' | '.join(headers)} |", f"|{'|'.join('---' for _ in headers)}|"]
+    lines.extend(f"| {' | '.join(row[header] for header in headers)} |" for row in rows)
+    return "\n".join(lines)
+
+
 def generate_comparison_table(
     hlsl_name: str,
     cpp_name: str,
@@ -1669,7 +2139,7 @@ def generate_comparison_table(
     cpp_data: StructDict,
     align_matches: list[tuple[FieldDict | None, FieldDict | None]],
     report: dict[str, int | float],
-    candidates: list[tuple[str, StructDict, float]],
+    candidates: list[StructCandidate] | list[tuple[str, StructDict, float]],
     status: str = "",
     depth: int = 2,
     section_id: Optional[str] = None,
@@ -1686,45 +2156,56 @@ def generate_comparison_table(
 
     # If showing top candidate and no accepted match, use the top candidate from candidates list
     if show_top_candidate and not has_cpp_match and not is_rejected_candidate and candidates:
-        top_candidate = candidates[0]  # candidates should be [(name, data, score, align_matches, report), ...]
-        cpp_name = f"{top_candidate[0]} (top candidate - rejected)"
-        cpp_data = top_candidate[1]
-        # Use pre-computed alignment data if available (candidates with 5 elements)
-        if len(top_candidate) >= 5:
-            align_matches = top_candidate[3]
-            report = top_candidate[4]
+        top_candidate = candidates[0]
+        if isinstance(top_candidate, StructCandidate):
+            # Evaluated candidates carry their alignment data
+            cpp_name = f"{top_candidate.name} (top candidate - rejected)"
+            cpp_data = top_candidate.data
+            align_matches = top_candidate.align_matches
+            report = top_candidate.report
         else:
-            # Fallback: compute alignment for legacy candidate format
-            result = align_structs(hlsl_data, cpp_data, 0.5)
-            if result:
-                _, align_matches, report = result
+            cpp_name = f"{top_candidate[0]} (top candidate - rejected)"
+            cpp_data = top_candidate[1]
+            # Use pre-computed alignment data if available (candidates with 5 elements)
+            if len(top_candidate) >= 5:
+                align_matches = top_candidate[3]
+                report = top_candidate[4]
             else:
-                # Ensure we have some basic data even if alignment fails
-                align_matches = []
-                report = {"score": top_candidate[2], "field_diff_count": 0}
+                # Fallback: compute alignment for legacy candidate format
+                result = align_structs(hlsl_data, cpp_data, 0.5)
+                if result:
+                    _, align_matches, report = result
+                else:
+                    # Ensure we have some basic data even if alignment fails
+                    align_matches = []
+                    report = {"score": top_candidate[2], "field_diff_count": 0}
         is_rejected_candidate = True
 
-    table = "---\n\n" if depth == 2 else ""
+    parts: list[str] = ["---\n\n"] if depth == 2 else []
     # Add a section anchor for cross-linking
     if section_id:
-        table += f'<a id="{section_id}"></a>\n'
-    table += f"{'#' * depth} HLSL `{hlsl_name}` ({os.path.basename(hlsl_data.get('file', ''))})\n"
-    table += f"**HLSL File:** [{hlsl_data.get('file', '')}:{hlsl_data.get('line', '')}]({create_link(hlsl_data.get('file', ''), hlsl_data.get('line', ''))})\n"
+        parts.append(f'<a id="{section_id}"></a>\n')
+    parts.append(f"{'#' * depth} HLSL `{hlsl_name}` ({os.path.basename(hlsl_data.get('file', ''))})\n")
+    parts.append(
+        f"**HLSL File:** [{hlsl_data.get('file', '')}:{hlsl_data.get('line', '')}]({create_link(hlsl_data.get('file', ''), hlsl_data.get('line', ''))})\n"
+    )
 
     # Handle unmatched case
     if not has_cpp_match and not is_rejected_candidate:
-        table += "\n**No matching C++ struct found**\n"
+        parts.append("\n**No matching C++ struct found**\n")
 
         # Summary section for unmatched structs
         hlsl_fields = hlsl_data.get("fields", [])
-        hlsl_total_fields = len([f for f in hlsl_fields if not is_padding_field(f)])
-        table += f"\n{'#' * (depth + 1)} Summary:\n"
-        table += f"- Total HLSL Fields: {hlsl_total_fields}\n"
-        table += "- Status: Unmatched\n"
+        hlsl_total_fields = count_non_padding_fields(hlsl_fields)
+        parts.append(f"\n{'#' * (depth + 1)} Summary:\n")
+        parts.append(f"- Total HLSL Fields: {hlsl_total_fields}\n")
+        parts.append("- Status: Unmatched\n")
     else:  # Handle matched or rejected candidate case
-        table += f"\n**C++**: `{cpp_name}`\n"
-        table += f"**C++ File:** [{cpp_data.get('file', '')}:{cpp_data.get('line', '')}]({create_link(cpp_data.get('file', ''), cpp_data.get('line', ''))})\n"
-        table += f"\n**Match Score:** {report.get('score', 0):.2f}\n"
+        parts.append(f"\n**C++**: `{cpp_name}`\n")
+        parts.append(
+            f"**C++ File:** [{cpp_data.get('file', '')}:{cpp_data.get('line', '')}]({create_link(cpp_data.get('file', ''), cpp_data.get('line', ''))})\n"
+        )
+        parts.append(f"\n**Match Score:** {report.get('score', 0):.2f}\n")
 
         # Field comparison table (for both matched and rejected candidates)
         # Always try to show field comparison for matched/rejected candidates
@@ -1750,7 +2231,7 @@ def generate_comparison_table(
 
                     # Compute similarities and apply emphasis
                     if hlsl_field and cpp_field:
-                        type_sim = jellyfish.jaro_winkler_similarity(hlsl_field_type, cpp_field_type)
+                        type_sim = JaroWinkler.normalized_similarity(hlsl_field_type, cpp_field_type)
                         # For emphasis, use exact string comparison to catch array notation differences
                         exact_name_match = hlsl_field_name == cpp_field_name
 
@@ -1776,42 +2257,41 @@ def generate_comparison_table(
 
                 # Determine if we should default to closed
                 should_close = rows_with_differences == 0
-                table += f"\n<details{'>' if should_close else ' open>'}\n"
-                table += f"<summary>{rows_with_differences} Field Differences</summary>\n\n"
+                parts.append(f"\n<details{'>' if should_close else ' open>'}\n")
+                parts.append(f"<summary>{rows_with_differences} Field Differences</summary>\n\n")
 
-                # Generate table using py_markdown_table
                 if field_rows:
-                    table += markdown_table(field_rows).set_params(row_sep="markdown", quote=False).get_markdown()
+                    parts.append(render_markdown_table(field_rows))
 
-                table += "\n</details>\n"
+                parts.append("\n</details>\n")
 
         # Summary section for matched structs
-        table += f"\n{'#' * (depth + 1)} Summary:\n"
-        table += f"- Exact Field Matches: {report.get('exact_matches', 0)}\n"
-        table += f"- High Similarity Field Matches: {report.get('high_sim_matches', 0)}\n"
+        parts.append(f"\n{'#' * (depth + 1)} Summary:\n")
+        parts.append(f"- Exact Field Matches: {report.get('exact_matches', 0)}\n")
+        parts.append(f"- High Similarity Field Matches: {report.get('high_sim_matches', 0)}\n")
 
         hlsl_total_fields = report.get("total_fields", 0)
         cpp_total_fields = report.get("cpp_total_fields", 0)
-        table += f"- Total HLSL Fields: {hlsl_total_fields}\n"
-        table += f"- Total C++ Fields: {cpp_total_fields}\n"
-        table += f"- Field Name Differences: {report.get('field_name_diff_count', 0)}\n"
-        table += f"- Field Type Differences: {report.get('field_type_diff_count', 0)}\n"
+        parts.append(f"- Total HLSL Fields: {hlsl_total_fields}\n")
+        parts.append(f"- Total C++ Fields: {cpp_total_fields}\n")
+        parts.append(f"- Field Name Differences: {report.get('field_name_diff_count', 0)}\n")
+        parts.append(f"- Field Type Differences: {report.get('field_type_diff_count', 0)}\n")
 
     # Always show candidates in a details section
     if candidates:
         total_candidates = len(candidates)
-        table += f"\n<details>\n<summary>Top 5 of {total_candidates} Candidates Reviewed</summary>\n\n"
+        parts.append(f"\n<details>\n<summary>Top 5 of {total_candidates} Candidates Reviewed</summary>\n\n")
         candidate_rows = []
         for candidate in candidates[:5]:
-            # Handle both old and new candidate formats
-            if len(candidate) == 3:
-                cand_name, cand_data, cand_score = candidate
+            # Handle both StructCandidate and tuple candidate formats
+            if isinstance(candidate, StructCandidate):
+                cand_name, cand_data, cand_score = candidate.name, candidate.data, candidate.score
             else:
                 cand_name, cand_data, cand_score = candidate[0], candidate[1], candidate[2]
 
             # Count fields in candidate
             cand_fields = cand_data.get("fields", [])
-            field_count = len([f for f in cand_fields if not is_padding_field(f)])
+            field_count = count_non_padding_fields(cand_fields)
 
             candidate_rows.append({
                 "Candidate Name": cand_name,
@@ -1820,35 +2300,43 @@ def generate_comparison_table(
                 "Similarity": f"{cand_score:.2f}",
             })
 
-        table += markdown_table(candidate_rows).set_params(row_sep="markdown", quote=False).get_markdown()
-        table += "\n</details>\n"
+        parts.append(render_markdown_table(candidate_rows))
+        parts.append("\n</details>\n")
 
-    return table
+    return "".join(parts)
 
 
 def count_field_differences(align_matches) -> tuple[int, int, int]:
     """
     Count field differences, returning (total_diff, name_diff, type_diff).
     """
-    total_diff = 0
-    name_diff = 0
-    type_diff = 0
+    name_only_diff = 0
+    type_only_diff = 0
+    unmatched = 0
     for hlsl_field, cpp_field in align_matches:
         if hlsl_field and cpp_field:
-            name_sim = compute_name_similarity(hlsl_field["name"], cpp_field["name"])
-            type_sim = jellyfish.jaro_winkler_similarity(hlsl_field["type"], cpp_field["type"])
-            if name_sim < 1:
-                name_diff += 1
-                total_diff += 1
-            elif type_sim < 0.7:
-                type_diff += 1
-                total_diff += 1
+            # Equal names and types need no scoring; other name scores are memoized from the alignment pass.
+            # Types are only compared when the names agree.
+            hlsl_name = hlsl_field["name"]
+            cpp_name = cpp_field["name"]
+            if hlsl_name != cpp_name and compute_name_similarity(hlsl_name, cpp_name) < 1:
+                name_only_diff += 1
+            else:
+                hlsl_type = hlsl_field["type"]
+                cpp_type = cpp_field["type"]
+                if (
+                    hlsl_type != cpp_type
+                    and JaroWinkler.normalized_similarity(hlsl_type, cpp_type, score_cutoff=0.7) < 0.7
+                ):
+                    type_only_diff += 1
         else:
             # Unmatched field counts as both a name and type diff
-            name_diff += 1
-            type_diff += 1
-            total_diff += 1
-    return total_diff, name_diff, type_diff
+            unmatched += 1
+    return (
+        name_only_diff + type_only_diff + unmatched,
+        name_only_diff + unmatched,
+        type_only_diff + unmatched,
+    )
 
 
 class InvalidStructDictType(Exception):
@@ -1856,6 +2344,63 @@ class InvalidStructDictType(Exception):
         super().__init__(f"Expected StructDict (dict) but got {type(obj)}")
 
 
+def _index_result_map(
+    result_map: ResultMap, use_template_type: bool
+) -> tuple[dict[tuple[str, str], str], dict[str, str]]:
+    """Index result_map keys by lowercased (file, struct name) and by struct name alone.
+
+    Args:
+        result_map: Buffer entries keyed by result key.
+        use_template_type: Index entries under their "Template Type" when set instead of their "Name".
+
+    Returns:
+        tuple: ((file, name) -> result key, name -> result key), keeping the first entry for each key.
+    """
+    by_file_and_name: dict[tuple[str, str], str] = {}
+    by_name: dict[str, str] = {}
+    for result_key, entry in result_map.items():
+        name = entry.get("Name", "")
+        if use_template_type:
+            name = entry.get("Template Type", "") or name
+        name = name.lower()
+        by_file_and_name.setdefault((entry.get("File Path", "").lower(), name), result_key)
+        by_name.setdefault(name, result_key)
+    return by_file_and_name, by_name
+
+
+def _index_struct_locations(structs: dict[str, list[StructDict]]) -> dict[tuple[str, str, int], StructDict]:
+    """Index struct declarations by (name, file, line), keeping the first declaration for each key.
+
+    Entries that are not dicts or lack a file or line cannot be looked up by location and are skipped.
+
+    Args:
+        structs (dict[str, list[StructDict]]): Struct declarations keyed by name.
+
+    Returns:
+        dict[tuple[str, str, int], StructDict]: The declarations keyed by location.
+    """
+    by_location: dict[tuple[str, str, int], StructDict] = {}
+    for name, struct_list in structs.items():
+        for struct_data in struct_list:
+            if not isinstance(struct_data, dict):
+                continue
+            file = struct_data.get("file")
+            line = struct_data.get("line")
+            if file is not None and line is not None:
+                by_location.setdefault((name, file, line), struct_data)
+    return by_location
+
+
+@functools.lru_cache(maxsize=65536)
+def _location_key(file: str, buffer_name: str) -> tuple[str, str]:
+    """Return the case-insensitive (file, buffer name) key used by StructAnalyzer.buffer_locations.
+
+    File paths repeat across many buffers, so the lowercased parts are interned
+    and the key is memoized instead of formatting a new string per lookup.
+    """
+    return sys.intern(file.lower()), sys.intern(buffer_name.lower())
+
+
 class StructAnalyzer:
     """Class to handle struct comparison and analysis."""
 
@@ -1870,6 +2415,17 @@ class StructAnalyzer:
         self.comparison_tables: list[str] = []
         self.buffer_locations: dict[tuple[str, str], tuple[str, int]] = {}
         self.analysis_results: dict[str, dict[str, Any]] = {}  # Store analysis links
+        self._cpp_by_name_lower: dict[str, list[tuple[str, StructDict]]] = {}  # Same-name fast path lookup
+        # Flattened fields keyed by id(struct_data); the struct and its field list are kept to validate hits
+        self._nested_fields_cache: dict[int, tuple[StructDict, list[FieldDict], list[FieldDict]]] = {}
+        self._cpp_candidate_variants: list[tuple[str, str, StructDict]] | None = None  # See _get_cpp_candidate_variants
+        # Struct data keyed by (name, file, line), rebuilt by _generate_comparison_tables
+        self._hlsl_by_location: dict[tuple[str, str, int], StructDict] = {}
+        self._cpp_by_location: dict[tuple[str, str, int], StructDict] = {}
+        for cpp_name, cpp_struct_list in cpp_structs.items():
+            self._cpp_by_name_lower.setdefault(cpp_name.lower(), []).extend(
+                (cpp_name, cpp_data) for cpp_data in cpp_struct_list
+            )
         hlsl_count = sum(len(struct_list) for struct_list in hlsl_structs.values())
         cpp_count = sum(len(struct_list) for struct_list in cpp_structs.values())
         logging.info(f"Initialized with {hlsl_count} HLSL structs and {cpp_count} C++ structs")
@@ -1882,9 +2438,20 @@ class StructAnalyzer:
             buffer_name: Name of the buffer
             line: Line number
         """
-        key = f"{file.lower()}:{buffer_name.lower()}"
-        self.buffer_locations[key] = (file, buffer_name)
-        logging.debug(f"Added buffer location: {key} -> ({file}, {buffer_name})")
+        key = _location_key(file, buffer_name)
+        self.buffer_locations[key] = (sys.intern(file), sys.intern(buffer_name))
+        logging.debug("Added buffer location: %s -> (%s, %s)", key, file, buffer_name)
+
+    def add_buffer_locations(self, locations: Iterable[tuple[str, str, int]]) -> None:
+        """Add many buffer locations to the map in one update.
+
+        Args:
+            locations: (file, buffer_name, line) tuples, as passed to add_buffer_location
+        """
+        self.buffer_locations.update(
+            (_location_key(file, buffer_name), (sys.intern(file), sys.intern(buffer_name)))
+            for file, buffer_name, _line in locations
+        )
 
     def get_buffer_location(self, file: str, buffer_name: str, line: int) -> tuple[str, int] | None:
         """Get the location of a buffer.
@@ -1897,8 +2464,7 @@ class StructAnalyzer:
         Returns:
             tuple[str, int] | None: (file, line) tuple if found, None otherwise
         """
-        key = f"{file.lower()}:{buffer_name.lower()}"
-        return self.buffer_locations.get(key)
+        return self.buffer_locations.get(_location_key(file, buffer_name))
 
     def _is_composite_buffer(self, struct_data: StructDict) -> bool:
         if not struct_data.get("is_cbuffer", False):
@@ -1922,7 +2488,9 @@ class StructAnalyzer:
 
         self.composite_buffers[buffer_name] = [field["type"] for field in fields]
         logging.debug(
-            f"Processing composite buffer {buffer_name} with contained structs: {self.composite_buffers[buffer_name]}"
+            "Processing composite buffer %s with contained structs: %s",
+            buffer_name,
+            self.composite_buffers[buffer_name],
         )
 
         # --- Process sub-buffers first ---
@@ -1973,9 +2541,13 @@ class StructAnalyzer:
         buffer_data["fields"] = hlsl_fields
 
         buffer_data["size"] = calculate_struct_size(hlsl_fields, align_to_16=True)
-        logging.debug(
-            f"Updated composite buffer {buffer_name} size to {buffer_data['size']} bytes (fields: {[(f['name'], f['type'], f['size']) for f in hlsl_fields]})"
-        )
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "Updated composite buffer %s size to %s bytes (fields: %s)",
+                buffer_name,
+                buffer_data["size"],
+                [(f["name"], f["type"], f["size"]) for f in hlsl_fields],
+            )
 
         # --- Now match the composite buffer itself ---
         candidates = self.find_struct_candidates(buffer_name, buffer_data, hlsl_fields, matched_cpp_structs)
@@ -2008,24 +2580,26 @@ class StructAnalyzer:
         if not matches and print_tables:
             print("\nNo matching structs found between HLSL and C++.")
             return
+        self._hlsl_by_location = _index_struct_locations(self.hlsl_structs)
+        self._cpp_by_location = _index_struct_locations(self.cpp_structs)
 
         composite_matches: dict[str, list[StructMatch]] = {}
         regular_matches: list[StructMatch] = []
 
-        logging.debug(f"Generating {len(matches)} comparison tables")
+        logging.debug("Generating %s comparison tables", len(matches))
+
+        # Map each struct name to the first composite buffer that is or contains it
+        struct_to_composite: dict[str, str] = {}
+        for composite_name, contained_structs in self.composite_buffers.items():
+            for struct_name in (*contained_structs, composite_name):
+                struct_to_composite.setdefault(struct_name, composite_name)
 
         for match in matches:
-            hlsl_name = match.hlsl_name
-            found_in_composite = False
-            for composite_name, contained_structs in self.composite_buffers.items():
-                if hlsl_name in contained_structs or hlsl_name == composite_name:
-                    if composite_name not in composite_matches:
-                        composite_matches[composite_name] = []
-                    composite_matches[composite_name].append(match)
-                    found_in_composite = True
-                    break
-            if not found_in_composite:
+            composite_name = struct_to_composite.get(match.hlsl_name)
+            if composite_name is None:
                 regular_matches.append(match)
+            else:
+                composite_matches.setdefault(composite_name, []).append(match)
 
         for match in regular_matches:
             self._generate_single_comparison_table(match, print_tables)
@@ -2060,23 +2634,31 @@ class StructAnalyzer:
         cpp_name: str = "",
     ) -> bool:
         """Improved match quality assessment with more nuanced criteria."""
-        logging.debug(f"Checking match for {hlsl_name} vs {cpp_name}:")
+        logging.debug("Checking match for %s vs %s:", hlsl_name, cpp_name)
 
         # 1. Absolute minimum score threshold (lowered)
         if score < 0.5:  # Reduced from 0.6
-            logging.debug(f"Rejected match for {hlsl_name} vs {cpp_name}: score {score:.3f} below threshold 0.5")
+            logging.debug("Rejected match for %s vs %s: score %.3f below threshold 0.5", hlsl_name, cpp_name, score)
             return False
 
         # 2. Enhanced field count analysis
         total_fields = report.get("total_fields", 1)
         cpp_total_fields = report.get("cpp_total_fields", 1)
+        if not total_fields or not cpp_total_fields:
+            # The field count ratio would be 0 (or undefined when both are empty)
+            logging.debug("Rejected match for %s vs %s: no non-padding fields to compare", hlsl_name, cpp_name)
+            return False
         field_count_ratio = min(total_fields, cpp_total_fields) / max(total_fields, cpp_total_fields)
 
         # More lenient for small structs
         min_ratio = 0.4 if max(total_fields, cpp_total_fields) <= 3 else 0.6
         if field_count_ratio < min_ratio:
             logging.debug(
-                f"Rejected match for {hlsl_name} vs {cpp_name}: field count ratio {field_count_ratio:.2f} < {min_ratio}"
+                "Rejected match for %s vs %s: field count ratio %.2f < %s",
+                hlsl_name,
+                cpp_name,
+                field_count_ratio,
+                min_ratio,
             )
             return False
 
@@ -2093,141 +2675,232 @@ class StructAnalyzer:
 
         if good_match_ratio < required_match_ratio:
             logging.debug(
-                f"Rejected match for {hlsl_name} vs {cpp_name}: good match ratio {good_match_ratio:.2f} < {required_match_ratio}"
+                "Rejected match for %s vs %s: good match ratio %.2f < %s",
+                hlsl_name,
+                cpp_name,
+                good_match_ratio,
+                required_match_ratio,
             )
             return False
 
-        # 4. Name similarity boost for very similar names
-        name_sim = compute_name_similarity(hlsl_name, cpp_name)
-        if name_sim > 0.8:
-            # Very similar names get more lenient treatment
-            return score > 0.4 and good_match_ratio > 0.2
-
-        # 5. Size difference check (more lenient)
+        # 4. Size difference check (more lenient)
         size_difference = report.get("size_difference", 0)
         max_size_diff = 128 if max(total_fields, cpp_total_fields) > 5 else 64
-        if size_difference > max_size_diff:
-            logging.debug(
-                f"Rejected match for {hlsl_name} vs {cpp_name}: size difference {size_difference} > {max_size_diff} bytes"
-            )
-            return False
+        size_ok = size_difference <= max_size_diff
 
-        # 6. Relative candidate quality (more lenient)
+        # 5. Relative candidate quality (more lenient)
+        score_gap = None
         if len(candidates) > 1:
-            best_score = score
             # Handle both StructCandidate objects and old tuple format
             if hasattr(candidates[1], "score"):
                 second_best_score = candidates[1].score
             else:
                 second_best_score = candidates[1][2] if len(candidates[1]) > 2 else 0
-            score_gap = best_score - second_best_score
+            score_gap = score - second_best_score
+        # Only reject if the best candidate isn't significantly better AND the score is low
+        gap_ok = score_gap is None or score_gap >= 0.05 or score >= 0.6
 
-            # Only reject if the best candidate isn't significantly better AND the score is low
-            if score_gap < 0.05 and best_score < 0.6:
-                logging.debug(f"Rejected match for {hlsl_name} vs {cpp_name}: insufficient score gap {score_gap:.3f}")
-                return False
+        if size_ok and gap_ok:
+            return True
 
-        return True
+        # 6. Name similarity boost for very similar names. The checks above already
+        # guarantee score >= 0.5 and good match ratio >= 0.3, so very similar names
+        # are accepted outright and only a would-be rejection needs the name score.
+        if compute_name_similarity(hlsl_name, cpp_name) > 0.8:
+            return True
+
+        if not size_ok:
+            logging.debug(
+                "Rejected match for %s vs %s: size difference %s > %s bytes",
+                hlsl_name,
+                cpp_name,
+                size_difference,
+                max_size_diff,
+            )
+        else:
+            logging.debug("Rejected match for %s vs %s: insufficient score gap %.3f", hlsl_name, cpp_name, score_gap)
+        return False
+
+    def _find_same_name_match(
+        self, hlsl_name: str, hlsl_data: StructDict, hlsl_fields: list[FieldDict]
+    ) -> StructMatch | None:
+        """Return a same-named C++ struct whose fields align exactly, skipping the full candidate scan.
+
+        A same-named struct with identical fields is the best candidate the full scan could find,
+        so only the C++ structs sharing the HLSL name (case-insensitive) are scored.
+
+        Args:
+            hlsl_name: Name of the HLSL struct.
+            hlsl_data: HLSL struct metadata.
+            hlsl_fields: List of HLSL fields.
+
+        Returns:
+            StructMatch | None: The accepted match, or None to fall back to the full candidate scan.
+        """
+        # The outlier boost needs the full candidate ranking, so no pre-score is passed
+        candidates = [
+            (cpp_name, cpp_data, 0.0)
+            for cpp_name, cpp_data in self._cpp_by_name_lower.get(hlsl_name.lower(), ())
+            if cpp_data.get("fields")
+        ]
+        if not candidates:
+            return None
+
+        best_match, sorted_candidates = self._find_best_match_from_candidates(
+            hlsl_name, hlsl_data, hlsl_fields, candidates, apply_score_boosts=True
+        )
+        if best_match is None:
+            return None
+        report = best_match.report
+        if report.get("field_diff_count", 1) or report.get("total_fields") != report.get("cpp_total_fields"):
+            return None
+        if not self._is_match_good_enough(best_match.score, report, sorted_candidates, hlsl_name, best_match.cpp_name):
+            return None
+        logging.debug(
+            "Accepted same-name match for %s: %s (score=%.3f)", hlsl_name, best_match.cpp_name, best_match.score
+        )
+        return best_match
+
+    def _match_struct(self, hlsl_name: str, hlsl_data: StructDict) -> StructMatch | None:
+        """Match a single non-composite HLSL struct against all C++ structs.
+
+        Args:
+            hlsl_name: Name of the HLSL struct.
+            hlsl_data: HLSL struct metadata.
+
+        Returns:
+            StructMatch | None: The accepted match, a rejected match with empty C++ info, or None if the
+            struct has no fields to compare.
+        """
+        logging.debug(
+            "Processing HLSL struct: %s : size=%s : %s:%s",
+            hlsl_name,
+            hlsl_data.get("size"),
+            hlsl_data.get("file", ""),
+            hlsl_data.get("line", ""),
+        )
+        hlsl_fields = self.get_nested_fields(hlsl_data)
+
+        if not hlsl_fields:
+            return None
+
+        same_name_match = self._find_same_name_match(hlsl_name, hlsl_data, hlsl_fields)
+        if same_name_match is not None:
+            return same_name_match
+
+        # Find all potential candidates (including exact name matches)
+        candidates = self.find_struct_candidates(hlsl_name, hlsl_data, hlsl_fields, set())
 
-    def compare_all_structs(self, result_map: ResultMap) -> dict[str, dict[str, str | bool]]:
-        """Compare HLSL and C++ structs, generating alignment reports."""
+        # Use shared helper to find best match with score boosts
+        best_match, sorted_candidates = self._find_best_match_from_candidates(
+            hlsl_name, hlsl_data, hlsl_fields, candidates, apply_score_boosts=True
+        )
+
+        # ONLY AFTER finding the best match, check if it's good enough
+        if best_match:
+            # Check if the match is good enough
+            if self._is_match_good_enough(
+                best_match.score, best_match.report, sorted_candidates, hlsl_name, best_match.cpp_name
+            ):
+                logging.debug(
+                    "Accepted match for %s: %s (score=%.3f)", hlsl_name, best_match.cpp_name, best_match.score
+                )
+                return best_match
+            logging.debug(
+                "Rejected match for %s: %s (score=%.3f) - quality too low",
+                hlsl_name,
+                best_match.cpp_name,
+                best_match.score,
+            )
+            # For rejected matches, create a match with empty cpp info but preserve candidate data
+            return StructMatch(
+                hlsl_name=hlsl_name,
+                hlsl_file=hlsl_data["file"],
+                hlsl_line=hlsl_data["line"],
+                cpp_name="",  # Empty cpp_name indicates rejection
+                cpp_file="",  # Empty cpp_file
+                cpp_line=0,  # Empty cpp_line
+                score=0.0,  # Zero score for status determination
+                align_matches=[],  # Empty align_matches for rejected
+                report=best_match.report,  # Preserve the actual report from best match
+                candidates=sorted_candidates,  # Preserve sorted candidates with full alignment info
+            )
+
+        # No candidates found
+        return StructMatch(
+            hlsl_name=hlsl_name,
+            hlsl_file=hlsl_data["file"],
+            hlsl_line=hlsl_data["line"],
+            cpp_name="",  # Empty cpp_name
+            cpp_file="",  # Empty cpp_file
+            cpp_line=0,  # Empty cpp_line
+            score=0.0,  # Zero score
+            align_matches=[],  # Empty align_matches
+            report={  # Empty report
+                "score": 0.0,
+                "exact_matches": 0,
+                "high_sim_matches": 0,
+                "total_fields": len(hlsl_fields),
+                "missing_fields": len(hlsl_fields),
+            },
+            candidates=sorted_candidates,  # Empty sorted_candidates
+        )
+
+    def compare_all_structs(self, result_map: ResultMap, jobs: int = 1) -> dict[str, dict[str, str | bool]]:
+        """Compare HLSL and C++ structs, generating alignment reports.
+
+        Args:
+            result_map: Buffer entries to annotate with struct analysis links.
+            jobs: Number of worker processes used to match structs; matching runs in the current process when 1.
+
+        Returns:
+            dict[str, dict[str, str | bool]]: Analysis links keyed by lowercased "file:struct".
+        """
         analysis_links: dict[str, dict[str, str | bool]] = {}
         matches: list[StructMatch] = []
         matched_cpp_structs = set()
 
-        match_counts = {
-            "Matched": 0,  # Perfect matches
-            "Mismatched": 0,  # Partial matches
-            "Unmatched": 0,  # No matches
-        }
-
         if not self.hlsl_structs:
             print("\nNo HLSL structs found.")
             self.analysis_links = analysis_links
             return analysis_links
 
+        # Composite buffers record which C++ structs they claim, so they are handled serially;
+        # every other struct is matched independently and can be farmed out to worker processes
+        pending: list[tuple[str, StructDict, bool]] = []
         for hlsl_name, hlsl_struct_list in self.hlsl_structs.items():
             for hlsl_data in hlsl_struct_list:
                 if not isinstance(hlsl_data, dict):
                     logging.error(f"Invalid hlsl_data for {hlsl_name}: {hlsl_data}")
                     continue
 
-                logging.debug(
-                    f"Processing HLSL struct: {hlsl_name} : size={hlsl_data.get('size')} : {hlsl_data.get('file', '')}:{hlsl_data.get('line', '')}"
-                )
-
-                if self._is_composite_buffer(hlsl_data):
-                    self._process_composite_buffer(hlsl_name, hlsl_data, matches, matched_cpp_structs)
-                    continue
-
-                if hlsl_data.get("is_template") and "template_type" in hlsl_data:
+                is_composite = self._is_composite_buffer(hlsl_data)
+                if not is_composite and hlsl_data.get("is_template") and "template_type" in hlsl_data:
                     template_type = hlsl_data["template_type"]
                     if template_type in self.hlsl_structs:
                         hlsl_data["fields"] = self.hlsl_structs[template_type][0]["fields"]
-                hlsl_fields = self.get_nested_fields(hlsl_data)
-
-                if not hlsl_fields:
-                    continue
-
-                # Find all potential candidates (including exact name matches)
-                candidates = self.find_struct_candidates(hlsl_name, hlsl_data, hlsl_fields, matched_cpp_structs)
-
-                # Use shared helper to find best match with score boosts
-                best_match, sorted_candidates = self._find_best_match_from_candidates(
-                    hlsl_name, hlsl_data, hlsl_fields, candidates, apply_score_boosts=True
-                )
+                pending.append((hlsl_name, hlsl_data, is_composite))
+
+        regular = [(hlsl_name, hlsl_data) for hlsl_name, hlsl_data, is_composite in pending if not is_composite]
+        if jobs > 1 and len(regular) > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_struct_match_worker,
+                initargs=(self.hlsl_structs, self.cpp_structs),
+            ) as executor:
+                regular_matches = list(executor.map(_match_struct_worker, *zip(*regular), chunksize=8))
+        else:
+            regular_matches = [self._match_struct(hlsl_name, hlsl_data) for hlsl_name, hlsl_data in regular]
 
-                # ONLY AFTER finding the best match, check if it's good enough
-                if best_match:
-                    # Check if the match is good enough
-                    if self._is_match_good_enough(
-                        best_match.score, best_match.report, sorted_candidates, hlsl_name, best_match.cpp_name
-                    ):
-                        matches.append(best_match)
-                        logging.debug(
-                            f"Accepted match for {hlsl_name}: {best_match.cpp_name} (score={best_match.score:.3f})"
-                        )
-                    else:
-                        # For rejected matches, create a match with empty cpp info but preserve candidate data
-                        matches.append(
-                            StructMatch(
-                                hlsl_name=hlsl_name,
-                                hlsl_file=hlsl_data["file"],
-                                hlsl_line=hlsl_data["line"],
-                                cpp_name="",  # Empty cpp_name indicates rejection
-                                cpp_file="",  # Empty cpp_file
-                                cpp_line=0,  # Empty cpp_line
-                                score=0.0,  # Zero score for status determination
-                                align_matches=[],  # Empty align_matches for rejected
-                                report=best_match.report,  # Preserve the actual report from best match
-                                candidates=sorted_candidates,  # Preserve sorted candidates with full alignment info
-                            )
-                        )
-                        logging.debug(
-                            f"Rejected match for {hlsl_name}: {best_match.cpp_name} (score={best_match.score:.3f}) - quality too low"
-                        )
-                else:
-                    # No candidates found
-                    matches.append(
-                        StructMatch(
-                            hlsl_name=hlsl_name,
-                            hlsl_file=hlsl_data["file"],
-                            hlsl_line=hlsl_data["line"],
-                            cpp_name="",  # Empty cpp_name
-                            cpp_file="",  # Empty cpp_file
-                            cpp_line=0,  # Empty cpp_line
-                            score=0.0,  # Zero score
-                            align_matches=[],  # Empty align_matches
-                            report={  # Empty report
-                                "score": 0.0,
-                                "exact_matches": 0,
-                                "high_sim_matches": 0,
-                                "total_fields": len(hlsl_fields),
-                                "missing_fields": len(hlsl_fields),
-                            },
-                            candidates=sorted_candidates,  # Empty sorted_candidates
-                        )
-                    )
+        # Merge in scan order so the output matches a serial run
+        regular_iter = iter(regular_matches)
+        for hlsl_name, hlsl_data, is_composite in pending:
+            if is_composite:
+                self._process_composite_buffer(hlsl_name, hlsl_data, matches, matched_cpp_structs)
+                continue
+            match = next(regular_iter)
+            if match is not None:
+                matches.append(match)
 
         self.matches = matches
 
@@ -2236,36 +2909,43 @@ class StructAnalyzer:
         self.analysis_links = analysis_links
 
         # Update analysis links in result_map
+        # Entries that are not linked below stay "Unmatched"
+        for entry in result_map.values():
+            entry.setdefault("Matching Struct Analysis", "Unmatched")
+        result_by_file_and_name, result_by_name = _index_result_map(result_map, use_template_type=True)
         for match in matches:
-            key = f"{match.hlsl_file.lower()}:{match.hlsl_name.lower()}"
+            hlsl_file_lower = match.hlsl_file.lower()
+            hlsl_name_lower = match.hlsl_name.lower()
+            key = f"{hlsl_file_lower}:{hlsl_name_lower}"
 
             # New logic for status:
-            if not match.cpp_name:
-                status = "Unmatched"
-                match_counts["Unmatched"] += 1
-            else:
+            field_diff_count = 0
+            diff_ratio = 0.0
+            if match.cpp_name:
                 field_diff_count = match.report.get("field_diff_count", 0)
                 cpp_total_fields = match.report.get("cpp_total_fields", 0)
                 hlsl_total_fields = match.report.get("total_fields", 0)
                 min_fields = min(hlsl_total_fields, cpp_total_fields)
                 diff_ratio = field_diff_count / max(1, min_fields)
-                debug_msg = f"DEBUG: {match.hlsl_name} vs {match.cpp_name}: field_diff_count={field_diff_count}, min_fields={min_fields}, diff_ratio={diff_ratio}, score={match.score}"
-                add_debug_info(debug_msg)
-                if diff_ratio > 0.5 or match.score < 0.75:
-                    status = "Unmatched"
-                    match_counts["Unmatched"] += 1
-                elif field_diff_count == 0:
-                    status = "Matched"
-                    match_counts["Matched"] += 1
-                elif field_diff_count <= 1:
-                    status = f"Mismatched ({match.cpp_name})"
-                    match_counts["Mismatched"] += 1
-                else:
-                    status = f"Mismatched ({match.cpp_name})"
-                    match_counts["Mismatched"] += 1
+                add_debug_info(
+                    "DEBUG: %s vs %s: field_diff_count=%s, min_fields=%s, diff_ratio=%s, score=%s",
+                    match.hlsl_name,
+                    match.cpp_name,
+                    field_diff_count,
+                    min_fields,
+                    diff_ratio,
+                    match.score,
+                )
+            if not match.cpp_name or diff_ratio > 0.5 or match.score < 0.75:
+                status = "Unmatched"
+            elif field_diff_count == 0:
+                status = "Matched"
+            else:
+                status = f"Mismatched ({match.cpp_name})"
 
+            link = create_struct_analysis_link(match.hlsl_name, match.hlsl_file, status)
             analysis_links[key] = {
-                "link": create_struct_analysis_link(match.hlsl_name, match.hlsl_file, status),
+                "link": link,
                 "is_match": bool(match.cpp_name),
                 "cpp_name": match.cpp_name,
                 "cpp_file": match.cpp_file,
@@ -2273,42 +2953,26 @@ class StructAnalyzer:
                 "score": match.score,
                 "status": status,
             }
-            # Look for entries using template type for struct analysis
-            for result_key, entry in result_map.items():
-                file_path = entry.get("File Path", "").lower()
-                buffer_name = entry.get("Name", "").lower()
-                template_type = entry.get("Template Type", "")
-
-                # Use template type for struct analysis if available, otherwise use buffer name
-                struct_name = template_type.lower() if template_type else buffer_name
-
-                # Check if this buffer entry should link to this struct analysis
-                if file_path == match.hlsl_file.lower() and struct_name == match.hlsl_name.lower():
-                    entry["Matching Struct Analysis"] = analysis_links[key]["link"]
-                    logging.debug(
-                        f"Updated result_map for {result_key} using template type {template_type} with link: {analysis_links[key]['link']}"
-                    )
-                    break
-            else:
+            # Link the buffer entry for this struct, using its template type when set
+            result_key = result_by_file_and_name.get((hlsl_file_lower, hlsl_name_lower))
+            if result_key is not None:
+                logging.debug("Updated result_map for %s with link: %s", result_key, link)
+            elif hlsl_name_lower not in BASE_TYPE_SIZES:
                 # Fallback: try name-only match for user-defined types
-                for result_key, entry in result_map.items():
-                    buffer_name = entry.get("Name", "").lower()
-                    template_type = entry.get("Template Type", "")
-                    struct_name = template_type.lower() if template_type else buffer_name
-
-                    if struct_name == match.hlsl_name.lower() and match.hlsl_name.lower() not in BASE_TYPE_SIZES:
-                        entry["Matching Struct Analysis"] = analysis_links[key]["link"]
-                        logging.debug(f"Fallback name-only match for {match.hlsl_name} to result_map key {result_key}")
-                        break
-                else:
-                    logging.warning(f"No buffer table entry found for struct {key}")
+                result_key = result_by_name.get(hlsl_name_lower)
+                if result_key is not None:
+                    logging.debug("Fallback name-only match for %s to result_map key %s", match.hlsl_name, result_key)
+            if result_key is not None:
+                result_map[result_key]["Matching Struct Analysis"] = link
+            else:
+                logging.warning(f"No buffer table entry found for struct {key}")
 
-        for entry in result_map.values():
-            if "Matching Struct Analysis" not in entry:
-                entry["Matching Struct Analysis"] = "Unmatched"
-                name = entry.get("Name", "unknown")
-                file_path = entry.get("File Path", "unknown")
-                logging.debug(f"Buffer {name} in {file_path} not matched to any struct")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for entry in result_map.values():
+                if entry["Matching Struct Analysis"] == "Unmatched":
+                    name = entry.get("Name", "unknown")
+                    file_path = entry.get("File Path", "unknown")
+                    logging.debug("Buffer %s in %s not matched to any struct", name, file_path)
 
         return analysis_links
 
@@ -2320,27 +2984,13 @@ class StructAnalyzer:
             print_tables: Whether to print the table immediately.
         """
         # Use hlsl_data from match if available, else find it
-        hlsl_data = next(
-            (
-                m
-                for m in self.hlsl_structs.get(match.hlsl_name, [])
-                if m["file"] == match.hlsl_file and m["line"] == match.hlsl_line
-            ),
-            {},
-        )
+        hlsl_data = self._hlsl_by_location.get((match.hlsl_name, match.hlsl_file, match.hlsl_line), {})
         if not hlsl_data:
             logging.warning(f"No HLSL data found for {match.hlsl_name} in {match.hlsl_file}:{match.hlsl_line}")
 
         # Only use cpp_data if there is a valid match (score > 0 and cpp_name is not empty)
         if match.cpp_name and match.score > 0:
-            cpp_data = next(
-                (
-                    s
-                    for s in self.cpp_structs.get(match.cpp_name, [])
-                    if s["file"] == match.cpp_file and s["line"] == match.cpp_line
-                ),
-                {},
-            )
+            cpp_data = self._cpp_by_location.get((match.cpp_name, match.cpp_file, match.cpp_line), {})
         else:
             cpp_data = {}
 
@@ -2350,10 +3000,7 @@ class StructAnalyzer:
         if not isinstance(cpp_data, dict):
             raise InvalidStructDictType(cpp_data)
 
-        logging.debug(f"Generating table for HLSL {match.hlsl_name} {match.hlsl_file}:{match.hlsl_line} ")
-
-        # Convert StructCandidate objects to the format expected by generate_comparison_table
-        candidates = [(c.name, c.data, c.score) for c in match.candidates]
+        logging.debug("Generating table for HLSL %s %s:%s ", match.hlsl_name, match.hlsl_file, match.hlsl_line)
 
         table_data = {
             "hlsl_name": match.hlsl_name,
@@ -2362,7 +3009,7 @@ class StructAnalyzer:
             "cpp_data": cpp_data,
             "align_matches": match.align_matches if cpp_data else [],
             "report": match.report,
-            "candidates": candidates,
+            "candidates": match.candidates,
         }
         self.comparison_tables.append(table_data)
 
@@ -2375,7 +3022,7 @@ class StructAnalyzer:
                     cpp_data,
                     match.align_matches if cpp_data else [],
                     match.report,
-                    candidates,
+                    match.candidates,
                     status=self.analysis_links.get(f"{match.hlsl_file.lower()}:{match.hlsl_name.lower()}", {}).get(
                         "status", ""
                     ),
@@ -2383,170 +3030,108 @@ class StructAnalyzer:
                 )
             )
 
+    def _render_comparison_table(
+        self,
+        table: dict[str, Any],
+        status: str,
+        show_top_candidate: bool,
+        depth: int = 2,
+        section_id: str | None = None,
+    ) -> str:
+        """Render one stored comparison table.
+
+        Args:
+            table: Table data stored by _generate_single_comparison_table.
+            status: Match status shown in the table summary.
+            show_top_candidate: Whether to show the top candidate's fields when the match was rejected.
+            depth: Markdown heading depth for the table.
+            section_id: Optional anchor id for cross-linking.
+
+        Returns:
+            str: Markdown for the table.
+        """
+        return generate_comparison_table(
+            table["hlsl_name"],
+            table["cpp_name"],
+            table["hlsl_data"],
+            table["cpp_data"],
+            table["align_matches"],
+            table["report"],
+            table["candidates"],
+            status=status,
+            depth=depth,
+            section_id=section_id,
+            show_top_candidate=show_top_candidate,
+        )
+
     def print_comparison_tables(self, only_matched: bool = False, show_top_candidate: bool = False) -> None:
         """Print comparison tables for all HLSL structs, with sub-buffers nested under their parents, using result_map as the source."""
-        print("\n# Struct Comparison Results")
+        # Collected and written once at the end; a run can print thousands of tables
+        output = ["\n# Struct Comparison Results"]
         printed_keys = set()
+
         # Build a lookup for table data
         table_lookup = {f"{t['hlsl_name']}:{t['hlsl_data']['file']}": t for t in self.comparison_tables}
-        logging.debug(f"Table lookup keys: {list(table_lookup.keys())}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Table lookup keys: %s", list(table_lookup.keys()))
+        # Resolve each table's status once; analysis_links is keyed by lowercased "file:struct"
+        status_by_key: dict[str, str] = {}
+        for k, t in table_lookup.items():
+            status_key = f"{t['hlsl_data']['file'].lower()}:{t['hlsl_name'].lower()}"
+            status_by_key[k] = self.analysis_links.get(status_key, {}).get("status", "")
+
+        def should_print(k):
+            status = status_by_key.get(k)
+            return status is not None and (not only_matched or status != "Unmatched")
+
         # Build a lookup for composite buffer relationships
+        files_by_name: dict[str, list[str]] = {}
+        for t in self.comparison_tables:
+            files_by_name.setdefault(t["hlsl_name"], []).append(t["hlsl_data"]["file"])
         composite_to_subs: dict[str, list[str]] = {}
         for buffer_name, sub_names in self.composite_buffers.items():
             for sub_name in sub_names:
-                # Find the file for the sub-buffer
-                for t in self.comparison_tables:
-                    if t["hlsl_name"] == sub_name:
-                        sub_key = f"{sub_name}:{t['hlsl_data']['file']}"
-                        parent_key = f"{buffer_name}:{t['hlsl_data']['file']}"
-                        composite_to_subs.setdefault(parent_key, []).append(
-                            sub_key
-                        )  # Use buffer_locations as the source
-        logging.debug(f"Buffer locations: {list(self.buffer_locations.items())}")
-        for _key, entry in self.buffer_locations.items():
-            file, buffer_name = entry
-            composite_key = f"{buffer_name}:{file}"
-            # If this is a composite buffer, check if any sub-buffers should be printed
-            if composite_key in composite_to_subs:
-                sub_keys = composite_to_subs[composite_key]
-                # Check if composite or any sub-buffer should be printed
-                keys_to_check = [composite_key, *sub_keys]
-
-                def should_print(k):
-                    table = table_lookup.get(k)
-                    if not table:
-                        return False
-                    status = self.analysis_links.get(
-                        f"{table['hlsl_data']['file'].lower()}:{table['hlsl_name'].lower()}", {}
-                    ).get("status", "")
-                    if only_matched:
-                        return status != "Unmatched"
-                    return True
-
-                should_print_any = any(should_print(k) for k in keys_to_check)
-                if should_print_any and composite_key not in printed_keys:
-                    print(f"\n## Composite Buffer: {buffer_name}\n")
-                    # Print composite buffer table if present
-                    table = table_lookup.get(composite_key)
-                    if table:
-                        # Handle show_top_candidate for composite buffer
-                        cpp_name = table["cpp_name"]
-                        cpp_data = table["cpp_data"]
-                        align_matches = table["align_matches"]
-                        report = table["report"]
-
-                        # If no accepted match but we want to show top candidate, extract from candidates
-                        if show_top_candidate and not cpp_name and table["candidates"]:
-                            top_candidate = table["candidates"][0]  # Best candidate
-                            cpp_name = f"{top_candidate[0]} (top candidate - rejected)"
-                            cpp_data = top_candidate[1]
-                            # For regular candidate tuples, use empty alignment data
-                            align_matches = []
-                            report = table["report"]
-                            print(
-                                generate_comparison_table(
-                                    table["hlsl_name"],
-                                    cpp_name,
-                                    table["hlsl_data"],
-                                    cpp_data,
-                                    align_matches,
-                                    report,
-                                    table["candidates"],
-                                    status=self.analysis_links.get(
-                                        f"{table['hlsl_data']['file'].lower()}:{table['hlsl_name'].lower()}",
-                                        {},
-                                    ).get("status", ""),
-                                    show_top_candidate=show_top_candidate,
-                                    section_id=create_struct_section_id(table["hlsl_name"], table["hlsl_data"]["file"]),
-                                )
-                            )
-                        printed_keys.add(composite_key)
-                    # Print sub-buffers
-                    for sub_key in sub_keys:
-                        if sub_key in printed_keys:
-                            continue
-                        table = table_lookup.get(sub_key)
-                        if table and should_print(sub_key):
-                            # Handle show_top_candidate for sub-buffers
-                            cpp_name = table["cpp_name"]
-                            cpp_data = table["cpp_data"]
-                            align_matches = table["align_matches"]
-                            report = table["report"]
-
-                            # If no accepted match but we want to show top candidate, use the first candidate
-                            if show_top_candidate and not cpp_name and table["candidates"]:
-                                top_candidate = table["candidates"][0]  # First candidate should be best after sorting
-                                cpp_name = f"{top_candidate[0]} (top candidate - rejected)"
-                                cpp_data = top_candidate[1]
-                                # Use the alignment data from the candidate
-                                align_matches = top_candidate[3] if len(top_candidate) > 3 else []
-                                report = top_candidate[4] if len(top_candidate) > 4 else table["report"]
-
-                            print(
-                                generate_comparison_table(
-                                    table["hlsl_name"],
-                                    cpp_name,
-                                    table["hlsl_data"],
-                                    cpp_data,
-                                    align_matches,
-                                    report,
-                                    table["candidates"],
-                                    status=self.analysis_links.get(
-                                        f"{table['hlsl_data']['file'].lower()}:{table['hlsl_name'].lower()}",
-                                        {},
-                                    ).get("status", ""),
-                                    depth=3,
-                                )
-                            )
-                            printed_keys.add(sub_key)
-            # Otherwise, print as a regular buffer if not already printed
-            else:
-                key_lookup = f"{buffer_name}:{file}"
-                logging.debug(f"Looking for key_lookup: {key_lookup}")
-                if key_lookup in printed_keys:
-                    logging.debug(f"Already printed: {key_lookup}")
+                # Find the files for the sub-buffer
+                for file in files_by_name.get(sub_name, ()):
+                    composite_to_subs.setdefault(f"{buffer_name}:{file}", []).append(f"{sub_name}:{file}")
+        # Use buffer_locations as the source
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Buffer locations: %s", list(self.buffer_locations.items()))
+        for file, buffer_name in self.buffer_locations.values():
+            table_key = f"{buffer_name}:{file}"
+            sub_keys = composite_to_subs.get(table_key, [])
+            if table_key in printed_keys:
+                logging.debug("Already printed: %s", table_key)
+                continue
+            if sub_keys:
+                # A composite buffer is shown when it or any of its sub-buffers should be printed
+                if not any(should_print(k) for k in (table_key, *sub_keys)):
                     continue
-                table = table_lookup.get(key_lookup)
-                if table:
-                    logging.debug(f"Found table for: {key_lookup}")
-                    status = self.analysis_links.get(
-                        f"{table['hlsl_data']['file'].lower()}:{table['hlsl_name'].lower()}", {}
-                    ).get("status", "")
-                    logging.debug(f"Status for {key_lookup}: {status}")
-                    if only_matched and status == "Unmatched":
-                        logging.debug(f"Skipping unmatched: {key_lookup}")
-                        continue
-                    # Handle show_top_candidate for regular buffers
-                    cpp_name = table["cpp_name"]
-                    cpp_data = table["cpp_data"]
-
-                    # If no accepted match but we want to show top candidate, use the first candidate
-                    if show_top_candidate and not cpp_name and table["candidates"]:
-                        top_candidate = table["candidates"][0]  # First candidate should be best after sorting
-                        cpp_name = f"{top_candidate[0]} (top candidate - rejected)"
-                        cpp_data = top_candidate[1]
-                        # Use empty alignment data for simple candidate tuples
-                        align_matches = []
-                        report = table["report"]
-                    else:
-                        align_matches = table["align_matches"]
-                        report = table["report"]
+                output.append(f"\n## Composite Buffer: {buffer_name}\n")
+            elif not should_print(table_key):
+                logging.debug("No table to print for: %s", table_key)
+                continue
 
-                    print(
-                        generate_comparison_table(
-                            table["hlsl_name"],
-                            cpp_name,
-                            table["hlsl_data"],
-                            cpp_data,
-                            align_matches,
-                            report,
-                            table["candidates"],
-                            status=status,
-                        )
+            for key in (table_key, *sub_keys):
+                table = table_lookup.get(key)
+                is_sub_buffer = key != table_key
+                if not table or key in printed_keys or (is_sub_buffer and not should_print(key)):
+                    continue
+                section_id = None
+                if sub_keys and not is_sub_buffer:
+                    section_id = create_struct_section_id(table["hlsl_name"], table["hlsl_data"]["file"])
+                output.append(
+                    self._render_comparison_table(
+                        table,
+                        status_by_key[key],
+                        show_top_candidate,
+                        depth=3 if is_sub_buffer else 2,
+                        section_id=section_id,
                     )
-                    printed_keys.add(key_lookup)
-                else:
-                    logging.debug(f"No table found for: {key_lookup}")
+                )
+                printed_keys.add(key)
+
+        print("\n".join(output))
 
     def update_result_map(self, result_map: dict[str, dict[str, Any]]) -> None:
         """Update the result map with stored analysis results.
@@ -2558,17 +3143,14 @@ class StructAnalyzer:
             logging.debug("No analysis results available to update result_map")
             return
 
-        # Create template type mapping
-        template_types: dict[str, str] = {}
-        for hlsl_name, struct_list in self.hlsl_structs.items():
-            for struct in struct_list:
-                if struct.get("is_template") and "template_type" in struct:
-                    template_types[hlsl_name] = struct["template_type"]
-
+        # Entries that are not linked below stay "Unmatched"
+        for entry in result_map.values():
+            entry.setdefault("Matching Struct Analysis", "Unmatched")
+        result_by_file_and_name, result_by_name = _index_result_map(result_map, use_template_type=False)
         for key, analysis in self.analysis_results.items():
             if key in result_map:
                 result_map[key]["Matching Struct Analysis"] = analysis["link"]
-                logging.debug(f"Updated result_map for {key} with link: {analysis['link']}")
+                logging.debug("Updated result_map for %s with link: %s", key, analysis["link"])
                 continue
 
             try:
@@ -2577,29 +3159,24 @@ class StructAnalyzer:
                 logging.warning(f"Invalid key format in analysis_results: {key}")
                 continue
 
-            for result_key, entry in result_map.items():
-                if entry.get("File Path", "").lower() == file and entry.get("Name", "").lower() == buffer_name:
-                    result_map[result_key]["Matching Struct Analysis"] = analysis["link"]
-                    logging.debug(f"Matched {key} to result_map key {result_key}")
-                    break
-                # Fallback: try file+name match (legacy)
-                elif entry.get("File Path", "").lower() == file and entry.get("Name", "").lower() == buffer_name:
-                    result_map[result_key]["Matching Struct Analysis"] = analysis["link"]
-                    logging.debug(f"Fallback file+name match for {key} to result_map key {result_key}")
-                    break
+            result_key = result_by_file_and_name.get((file, buffer_name))
+            if result_key is not None:
+                logging.debug("Matched %s to result_map key %s", key, result_key)
+            elif buffer_name not in BASE_TYPE_SIZES:
                 # Fallback: try name-only match for user-defined types
-                elif entry.get("Name", "").lower() == buffer_name and buffer_name not in BASE_TYPE_SIZES:
-                    result_map[result_key]["Matching Struct Analysis"] = analysis["link"]
-                    logging.debug(f"Fallback name-only match for {key} to result_map key {result_key}")
-                    break
-                else:
-                    logging.warning(f"No buffer table entry found for struct {key}")
-        for entry in result_map.values():
-            if "Matching Struct Analysis" not in entry:
-                entry["Matching Struct Analysis"] = "Unmatched"
-                name = entry.get("Name", "unknown")
-                file_path = entry.get("File Path", "unknown")
-                logging.debug(f"Buffer {name} in {file_path} not matched to any struct")
+                result_key = result_by_name.get(buffer_name)
+                if result_key is not None:
+                    logging.debug("Fallback name-only match for %s to result_map key %s", key, result_key)
+            if result_key is not None:
+                result_map[result_key]["Matching Struct Analysis"] = analysis["link"]
+            else:
+                logging.warning(f"No buffer table entry found for struct {key}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for entry in result_map.values():
+                if entry["Matching Struct Analysis"] == "Unmatched":
+                    name = entry.get("Name", "unknown")
+                    file_path = entry.get("File Path", "unknown")
+                    logging.debug("Buffer %s in %s not matched to any struct", name, file_path)
 
     def get_nested_fields(self, struct_data: StructDict) -> list[FieldDict]:
         """Get all fields from a struct, including nested struct fields.
@@ -2609,11 +3186,16 @@ class StructAnalyzer:
 
         Returns:
             list[FieldDict]: List of field dictionaries, including nested fields.
+            The list is cached per struct and must not be modified.
         """
         fields = struct_data.get("fields", [])
         if not fields:
             return []
 
+        cached = self._nested_fields_cache.get(id(struct_data))
+        if cached is not None and cached[0] is struct_data and cached[1] is fields:
+            return cached[2]
+
         processed_fields: list[FieldDict] = []
 
         # Determine which struct dictionary to use based on the struct's origin
@@ -2642,6 +3224,7 @@ class StructAnalyzer:
             else:
                 processed_fields.append(field)
 
+        self._nested_fields_cache[id(struct_data)] = (struct_data, fields, processed_fields)
         return processed_fields
 
     def get_field_name(self, field: FieldDict) -> str:
@@ -2662,13 +3245,42 @@ class StructAnalyzer:
             return ""
         return strip_array_notation(field["name"])
 
+    def _get_cpp_candidate_variants(self) -> list[tuple[str, str, StructDict]]:
+        """Return the C++ struct variants tried as candidates, building them on first use.
+
+        Each C++ struct is tried with its fields as declared ("original") and, when it
+        nests other structs, with its fields flattened ("flattened"). C++ structs do not
+        change during matching, so the variants are shared by every HLSL struct.
+
+        Returns:
+            list[tuple[str, str, StructDict]]: (cpp_name, variant, cpp_data) tuples.
+        """
+        if self._cpp_candidate_variants is None:
+            variants: list[tuple[str, str, StructDict]] = []
+            for cpp_name, cpp_struct_list in self.cpp_structs.items():
+                for cpp_data in cpp_struct_list:
+                    original_fields = cpp_data.get("fields", [])
+                    if original_fields:
+                        temp_cpp_data = dict(cpp_data)
+                        temp_cpp_data["fields"] = original_fields
+                        variants.append((cpp_name, "original", temp_cpp_data))
+
+                    flattened_fields = self.get_nested_fields(cpp_data)
+                    if flattened_fields != original_fields:
+                        temp_cpp_data = dict(cpp_data)
+                        temp_cpp_data["fields"] = flattened_fields
+                        temp_cpp_data["size"] = calculate_struct_size(flattened_fields)
+                        variants.append((cpp_name, "flattened", temp_cpp_data))
+            self._cpp_candidate_variants = variants
+        return self._cpp_candidate_variants
+
     def find_struct_candidates(
         self,
         hlsl_name: str,
         hlsl_data: StructDict,
         hlsl_fields: list[FieldDict],
         matched_cpp_structs: set[str],
-    ) -> list[tuple[str, StructDict, float]]:
+    ) -> list[CandidateTuple]:
         """Find candidate C++ structs for an HLSL struct.
 
         Args:
@@ -2678,44 +3290,25 @@ class StructAnalyzer:
             matched_cpp_structs: Set of already matched C++ struct names.
 
         Returns:
-            list[tuple[str, StructDict, float]]: List of (cpp_name, cpp_data, similarity) tuples.
+            list[CandidateTuple]: List of (cpp_name, cpp_data, similarity, align_matches, report) tuples,
+            where the alignment was computed with a struct name weight of 0.5.
         """
-        candidates: list[tuple[str, StructDict, float]] = []
-
-        for cpp_name, cpp_struct_list in self.cpp_structs.items():
-            for cpp_data in cpp_struct_list:
-                # Test original version
-                original_fields = cpp_data.get("fields", [])
-                if original_fields:
-                    temp_cpp_data = dict(cpp_data)
-                    temp_cpp_data["fields"] = original_fields
-
-                    result = align_structs(temp_cpp_data, hlsl_data, 0.5)
-                    if result is not None:
-                        alignment_score, _, _ = result
-                        candidates.append((cpp_name, temp_cpp_data, alignment_score))
-
-                        logging.debug(
-                            f"\t\t Candidate {cpp_name} (original) from {cpp_data.get('file', 'unknown')}: "
-                            f"alignment_score={alignment_score:.2f}, total_size={calculate_struct_size(original_fields)}, fields: {[(f['name'], f['type'], f['size']) for f in original_fields]}"
-                        )
+        candidates: list[CandidateTuple] = []
 
-                # Test flattened version if different
-                flattened_fields = self.get_nested_fields(cpp_data)
-                if flattened_fields != original_fields:
-                    temp_cpp_data = dict(cpp_data)
-                    temp_cpp_data["fields"] = flattened_fields
-                    temp_cpp_data["size"] = calculate_struct_size(flattened_fields)
-
-                    result = align_structs(temp_cpp_data, hlsl_data, 0.5)
-                    if result is not None:
-                        alignment_score, _, _ = result
-                        candidates.append((f"{cpp_name}", temp_cpp_data, alignment_score))
-
-                        logging.debug(
-                            f"\t\t Candidate {cpp_name} (flattened) from {cpp_data.get('file', 'unknown')}: "
-                            f"alignment_score={alignment_score:.2f}, total_size={calculate_struct_size(flattened_fields)}, fields: {[(f['name'], f['type'], f['size']) for f in flattened_fields]}"
-                        )
+        for cpp_name, variant, cpp_data in self._get_cpp_candidate_variants():
+            alignment_score, align_matches, report = align_structs(cpp_data, hlsl_data, 0.5)
+            candidates.append((cpp_name, cpp_data, alignment_score, align_matches, report))
+
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(
+                    "\t\t Candidate %s (%s) from %s: alignment_score=%.2f, total_size=%s, fields: %s",
+                    cpp_name,
+                    variant,
+                    cpp_data.get("file", "unknown"),
+                    alignment_score,
+                    calculate_struct_size(cpp_data["fields"]),
+                    [(f["name"], f["type"], f["size"]) for f in cpp_data["fields"]],
+                )
         candidates.sort(key=lambda x: x[2], reverse=True)
         return candidates
 
@@ -2724,7 +3317,7 @@ class StructAnalyzer:
         hlsl_name: str,
         hlsl_data: StructDict,
         hlsl_fields: list[FieldDict],
-        candidates: list[tuple[str, StructDict, float]],
+        candidates: list[CandidateTuple],
         apply_score_boosts: bool = True,
     ) -> tuple[StructMatch | None, list[StructCandidate]]:
         """Find the best match among candidates and return StructMatch with candidate list.
@@ -2733,7 +3326,8 @@ class StructAnalyzer:
             hlsl_name: Name of the HLSL struct
             hlsl_data: HLSL struct metadata
             hlsl_fields: List of HLSL fields
-            candidates: List of (cpp_name, cpp_data, similarity) tuples
+            candidates: List of (cpp_name, cpp_data, similarity) tuples, optionally followed by the
+                align_matches and report computed with a struct name weight of 0.5
             apply_score_boosts: Whether to apply score boosts for exact name matches and outliers
 
         Returns:
@@ -2743,62 +3337,75 @@ class StructAnalyzer:
             return None, []
 
         evaluated_candidates = []
-        best_score = -1
-        best_match = None
+        best_candidate: StructCandidate | None = None
 
-        for idx, (cpp_name, cpp_data, similarity) in enumerate(candidates):
+        struct_name_weight = 0.7 if len(hlsl_fields) <= 3 else 0.5
+        for idx, (cpp_name, cpp_data, similarity, *alignment) in enumerate(candidates):
             if not isinstance(cpp_data, dict):
                 logging.error(f"Invalid cpp_data for {cpp_name}: {cpp_data}")
                 continue
 
-            struct_name_weight = 0.7 if len(hlsl_fields) <= 3 else 0.5
-            result = align_structs(cpp_data, hlsl_data, struct_name_weight)
-
-            if result is not None:
-                score, align_matches, report = result
-                logging.debug(f"Evaluating {hlsl_name} vs {cpp_name}: score={score:.3f}")
-
-                # Apply score boosts if requested
-                if apply_score_boosts:
-                    if cpp_name == hlsl_name:
-                        score *= 1.05
-                    if similarity > 0.85 and (
-                        idx == 0 and (len(candidates) == 1 or similarity - candidates[1][2] > 0.2)
-                    ):
-                        score *= 1.05
+            if alignment and (struct_name_weight == 0.5 or not alignment[0]):
+                # find_struct_candidates already aligned this pair with the same weight, or the pair was
+                # rejected by the size/field count gate, which does not depend on the weight
+                score, align_matches, report = similarity, *alignment
+            else:
+                score, align_matches, report = align_structs(cpp_data, hlsl_data, struct_name_weight)
+            logging.debug("Evaluating %s vs %s: score=%.3f", hlsl_name, cpp_name, score)
+
+            # Apply score boosts if requested
+            if apply_score_boosts:
+                if cpp_name == hlsl_name:
+                    score *= 1.05
+                if similarity > 0.85 and (idx == 0 and (len(candidates) == 1 or similarity - candidates[1][2] > 0.2)):
+                    score *= 1.05
+
+            # Store evaluated candidate with full alignment info
+            candidate = StructCandidate(
+                name=cpp_name, data=cpp_data, score=score, align_matches=align_matches, report=report
+            )
+            evaluated_candidates.append(candidate)
 
-                # Store evaluated candidate with full alignment info
-                candidate = StructCandidate(
-                    name=cpp_name, data=cpp_data, score=score, align_matches=align_matches, report=report
-                )
-                evaluated_candidates.append(candidate)
-
-                if score > best_score:
-                    logging.debug(f"New best match for {hlsl_name}: {cpp_name} (score={score:.3f})")
-                    best_score = score
-                    best_match = StructMatch(
-                        hlsl_name=hlsl_name,
-                        hlsl_file=hlsl_data["file"],
-                        hlsl_line=hlsl_data["line"],
-                        cpp_name=cpp_name,
-                        cpp_file=cpp_data["file"],
-                        cpp_line=cpp_data["line"],
-                        score=score,
-                        align_matches=align_matches,
-                        report=report,
-                        candidates=evaluated_candidates,  # Will be updated below
-                    )
+            if best_candidate is None or score > best_candidate.score:
+                logging.debug("New best match for %s: %s (score=%.3f)", hlsl_name, cpp_name, score)
+                best_candidate = candidate
 
         # Re-sort candidates by actual evaluation scores
         evaluated_candidates.sort(key=lambda x: x.score, reverse=True)
 
-        # Update the match to use sorted candidates
-        if best_match:
-            best_match.candidates = evaluated_candidates
-
+        if best_candidate is None:
+            return None, evaluated_candidates
+        best_match = StructMatch(
+            hlsl_name=hlsl_name,
+            hlsl_file=hlsl_data["file"],
+            hlsl_line=hlsl_data["line"],
+            cpp_name=best_candidate.name,
+            cpp_file=best_candidate.data["file"],
+            cpp_line=best_candidate.data["line"],
+            score=best_candidate.score,
+            align_matches=best_candidate.align_matches,
+            report=best_candidate.report,
+            candidates=evaluated_candidates,
+        )
         return best_match, evaluated_candidates
 
 
+_worker_analyzer: StructAnalyzer  # Set in each worker process by _init_struct_match_worker
+
+
+def _init_struct_match_worker(
+    hlsl_structs: dict[str, list[StructDict]], cpp_structs: dict[str, list[StructDict]]
+) -> None:
+    """Build the analyzer once per worker process so struct dicts are not pickled for every task."""
+    global _worker_analyzer
+    _worker_analyzer = StructAnalyzer(hlsl_structs, cpp_structs)
+
+
+def _match_struct_worker(hlsl_name: str, hlsl_data: StructDict) -> StructMatch | None:
+    """Match one HLSL struct in a worker process (see StructAnalyzer._match_struct)."""
+    return _worker_analyzer._match_struct(hlsl_name, hlsl_data)
+
+
 def main() -> None:
     """Main entry point for scanning HLSL shaders and generating a buffer table."""
     logging.basicConfig(level=logging.DEBUG)
@@ -2818,66 +3425,55 @@ def main() -> None:
         action="store_true",
         help="Show register conflicts analysis (default: disabled)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to preprocess shader files and match structs (default: 1)",
+    )
     args = parser.parse_args()
     cwd = os.getcwd()
 
     scanner = FileScanner(cwd)
     defines_list = get_defines_list()
-    shader_pattern = re.compile(
-        r"""(?P<type>
-                (?:cbuffer|ConstantBuffer<(?P<template_type>\w+)>) |
-                (?:(?:RW)?(?:StructuredBuffer|Buffer|Texture1D|Texture2D|Texture3D|TextureCube|RWBuffer|RWTexture1D|RWTexture2D|RWTexture3D|RWTextureCube|SamplerState|SamplerComparisonState))
-                (?:<(?P<template_name>\w+)>)?
-            )
-            \s+
-            (?P<name>\w+)
-            \s*:\s*register\s*\(
-                (?P<buffer_type>[a-z])
-                (?P<buffer_number>\d+)
-            \)
-            (?:\s*;\s*|$)
-        """,
-        re.MULTILINE | re.VERBOSE,
-    )
-    hlsl_types = {"b": "CBV", "t": "SRV", "u": "UAV", "s": "Sampler"}
-    pattern = re.compile(r".*\.(hlsl|hlsli)$", re.IGNORECASE)
-    feature_pattern = re.compile(r"features[/\\](?P<feature>[^/\\]+)")
 
     results, compilation_units = scanner.scan_for_buffers(
-        pattern=pattern,
-        feature_pattern=feature_pattern,
-        shader_pattern=shader_pattern,
-        hlsl_types=hlsl_types,
+        pattern=HLSL_FILE_REGEX,
+        feature_pattern=FEATURE_DIR_REGEX,
+        shader_pattern=SHADER_BUFFER_REGEX,
+        hlsl_types=HLSL_REGISTER_TYPES,
         defines_list=defines_list,
+        jobs=args.jobs,
     )
 
     result_map = {f"{entry['File Path'].lower()}:{entry['Name'].lower()}": entry for entry in results}
-    logging.debug(f"Result map contains {len(result_map)} entries: {list(result_map.keys())}")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Result map contains %s entries: %s", len(result_map), list(result_map.keys()))
 
     hlsl_structs, cpp_structs = scanner.scan_for_structs()
     analyzer = StructAnalyzer(hlsl_structs, cpp_structs)
 
-    for entry in result_map.values():
-        file = entry.get("File Path")
-        buffer_name = entry["Name"]
-        line = entry.get("Original Line")
-        if file is not None and buffer_name is not None:
-            analyzer.add_buffer_location(file, buffer_name, line)
+    analyzer.add_buffer_locations(
+        (entry["File Path"], entry["Name"], entry.get("Original Line"))
+        for entry in result_map.values()
+        if entry.get("File Path") is not None and entry["Name"] is not None
+    )
 
-    analyzer.compare_all_structs(result_map)
+    analyzer.compare_all_structs(result_map, jobs=args.jobs)
     analyzer.update_result_map(result_map)
 
     # Add all struct definitions to buffer_locations for printing
+    struct_locations: list[tuple[str, str, int]] = []
     for hlsl_name, hlsl_struct_list in analyzer.hlsl_structs.items():
         for hlsl_data in hlsl_struct_list:
-            if isinstance(hlsl_data, dict):
-                file = hlsl_data.get("file", "")
+            file = hlsl_data.get("file", "")
+            if file:
                 line = hlsl_data.get("line", 0)
-                if file:
-                    analyzer.add_buffer_location(file, hlsl_name, line)
-                    logging.debug(f"Added struct definition to buffer_locations: {hlsl_name} from {file}:{line}")
-                else:
-                    logging.debug(f"Skipping struct {hlsl_name} - no file information")
+                struct_locations.append((file, hlsl_name, line))
+                logging.debug("Added struct definition to buffer_locations: %s from %s:%s", hlsl_name, file, line)
+            else:
+                logging.debug("Skipping struct %s - no file information", hlsl_name)
+    analyzer.add_buffer_locations(struct_locations)
     print_buffers_and_conflicts(result_map, compilation_units, show_conflicts=args.show_conflicts)
     analyzer.print_comparison_tables(only_matched=args.only_matched, show_top_candidate=args.show_top_candidate)
 
@@ -3,8 +3,10 @@
 import re
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 from hlslkit.buffer_scan import (
+    FileScanner,
     # Main classes and data structures
     StructAnalyzer,
     StructCandidate,
@@ -24,6 +26,7 @@ from hlslkit.buffer_scan import (
     get_excluded_dirs,
     # Type handling
     get_hlsl_types,
+    get_ignore_spec,
     get_struct_signature,
     parse_field,  # This is the actual function name, not parse_hlsl_field/parse_cpp_field
     # Core processing
@@ -234,6 +237,27 @@ struct VertexData {
     assert len(result["VertexData"]["fields"]) == 2
 
 
+def test_extract_hlsl_structs_template_buffers():
+    """Test extract_hlsl_structs resolves template buffers against structs declared later."""
+    code = """
+StructuredBuffer<LightData> Lights : register(t0);
+RWStructuredBuffer<Counter> Counters : register(u1);
+StructuredBuffer<float4> Colors : register(t2);
+struct LightData {
+    float3 color;
+    float radius;
+};
+"""
+    result = extract_hlsl_structs(code, "test.hlsli")
+    assert result["LightData"]["is_template"] is False
+    assert len(result["LightData"]["fields"]) == 2
+    assert "Lights" not in result
+    assert result["Counter"]["is_template"] is True
+    assert result["Counters"]["template_type"] == "Counter"
+    assert "float4" not in result
+    assert "Colors" not in result
+
+
 def test_extract_cpp_structs():
     """Test extract_cpp_structs with C++ code."""
     code = """
@@ -254,6 +278,22 @@ struct alignas(16) AlignedData {
     assert result["Settings"]["fields"][0]["type"] == "float"
 
 
+def test_extract_cpp_structs_skips_static_and_unparsed_members():
+    """Test extract_cpp_structs keeps only parsable non-static members."""
+    code = """
+struct Settings {
+    static constexpr uint kCount = 4;
+    float opacity;
+    operator();
+    uint flags[2];
+};
+"""
+    result = extract_cpp_structs(code, "test.h")
+    fields = result["Settings"]["fields"]
+    assert [f["name"] for f in fields] == ["opacity", "flags[2]"]
+    assert fields[1]["size"] == 8
+
+
 def test_extract_structs_hlsl():
     """Test extract_structs wrapper function for HLSL."""
     code = """
@@ -477,6 +517,42 @@ def test_struct_analyzer_compare_all_structs():
     assert isinstance(analyzer.matches, list)
 
 
+def test_struct_analyzer_compare_all_structs_parallel_matches_serial():
+    """Test that matching structs in worker processes gives the same results as a serial run."""
+
+    def make_struct(name, file, line, fields):
+        return {
+            "fields": [{"name": n, "type": t, "size": size} for n, t, size in fields],
+            "file": file,
+            "line": line,
+            "is_cbuffer": False,
+            "name": name,
+        }
+
+    light_fields = [("position", "float4", 16), ("color", "float3", 12), ("radius", "float", 4)]
+    material_fields = [("albedo", "float4", 16), ("roughness", "float", 4), ("metallic", "float", 4)]
+    hlsl_structs = {
+        "Light": [make_struct("Light", "light.hlsl", 1, light_fields)],
+        "Material": [make_struct("Material", "material.hlsl", 2, material_fields)],
+        "Empty": [make_struct("Empty", "empty.hlsl", 3, [])],
+    }
+    cpp_structs = {
+        "Light": [make_struct("Light", "light.h", 4, light_fields)],
+        "MaterialData": [make_struct("MaterialData", "material.h", 5, material_fields)],
+    }
+
+    serial = StructAnalyzer(hlsl_structs, cpp_structs)
+    serial_links = serial.compare_all_structs({})
+    parallel = StructAnalyzer(hlsl_structs, cpp_structs)
+    parallel_links = parallel.compare_all_structs({}, jobs=2)
+
+    assert parallel_links == serial_links
+    assert [(m.hlsl_name, m.cpp_name, m.score) for m in parallel.matches] == [
+        (m.hlsl_name, m.cpp_name, m.score) for m in serial.matches
+    ]
+    assert [m.hlsl_name for m in serial.matches] == ["Light", "Material"]
+
+
 # Phase 1: Core Functionality Tests (Target: +15% coverage)
 
 
@@ -668,6 +744,66 @@ cbuffer BufferB : register(b1) { float4 b; };
                     raise
 
 
+def test_process_file_records_define_combination():
+    """Test process_file records registers and define combinations in standard order."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        test_file = Path(temp_dir) / "test.hlsl"
+        test_file.write_text("cbuffer PerFrame : register(b0) { float4 a; };\n", encoding="utf-8")
+        shader_pattern = re.compile(
+            r"(?P<type>cbuffer)(?:<(?P<template_name>\w+)>)?\s+(?P<name>\w+)\s*:\s*register\s*"
+            r"\((?P<buffer_type>[a-z])(?P<buffer_number>\d+)\)",
+            re.MULTILINE,
+        )
+        result_map = {}
+        compilation_units = {}
+
+        process_file(
+            str(test_file),
+            temp_dir,
+            {"VR": "", "PSHADER": ""},
+            shader_pattern,
+            {"b": "CBV"},
+            "test_feature",
+            "test.hlsl",
+            result_map,
+            compilation_units,
+        )
+
+        (entry,) = result_map.values()
+        assert entry["Register"] == "b0"
+        assert entry["Define Combinations"] == {"PSHADER_VR"}
+        assert entry["PSHADER"] and entry["VR"] and not entry["VSHADER"]
+        assert compilation_units == {("test.hlsl", frozenset({"VR", "PSHADER"})): {"b0": {"test_feature"}}}
+
+
+def test_process_file_skips_files_without_registers():
+    """Test process_file does not preprocess files that declare no registers."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        test_file = Path(temp_dir) / "helpers.hlsli"
+        test_file.write_text("float4 Helper(float4 x) { return x; }\n", encoding="utf-8")
+        result_map = {}
+        compilation_units = {}
+
+        with patch("hlslkit.buffer_scan.pcpp.Preprocessor") as mock_preprocessor:
+            process_file(
+                str(test_file),
+                temp_dir,
+                {},
+                re.compile(r"(?P<name>\w+)\s*:\s*register"),
+                {"b": "CBV"},
+                "",
+                "helpers.hlsli",
+                result_map,
+                compilation_units,
+            )
+
+        mock_preprocessor.assert_not_called()
+        assert result_map == {}
+        assert compilation_units == {}
+
+
 # 2. .gitignore Parsing Tests
 def test_get_excluded_dirs_from_gitignore_valid_file():
     """Test get_excluded_dirs with valid .gitignore file."""
@@ -723,6 +859,34 @@ def test_get_excluded_dirs_from_gitignore_malformed_file():
         assert isinstance(excluded_dirs, set)
 
 
+def test_get_ignore_spec_missing_file():
+    """Test get_ignore_spec returns None without a .gitignore file."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        assert get_ignore_spec(temp_dir) is None
+
+
+def test_file_scanner_honours_nested_gitignore_rules():
+    """Test that the file scan skips nested ignored directories and ignored files."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / ".gitignore").write_text("features/Generated/\n*.gen.hlsl\n", encoding="utf-8")
+        for rel_path in (
+            "features/Grass/Shaders/Grass.hlsl",
+            "features/Generated/Shaders/Auto.hlsl",
+            "package/Shaders/Lighting.gen.hlsl",
+            "package/Shaders/Lighting.hlsl",
+        ):
+            (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel_path).write_text("", encoding="utf-8")
+
+        scanner = FileScanner(temp_dir)
+        short_paths = sorted(short_path for _, _, short_path, _ in scanner._walk_once())
+
+        assert short_paths == ["features/Grass/Shaders/Grass.hlsl", "package/Shaders/Lighting.hlsl"]
+
+
 # 3. Complex Struct Analysis Tests
 def test_find_struct_candidates_multiple_matches():
     """Test find_struct_candidates with multiple potential matches."""
@@ -1210,6 +1374,35 @@ def test_generate_comparison_table_rejected_candidate():
     assert "Top 5 of 1 Candidates Reviewed" in table
 
 
+def test_generate_comparison_table_struct_candidates():
+    from hlslkit.buffer_scan import StructCandidate, align_structs, generate_comparison_table
+
+    hlsl_data = {
+        "name": "TestStruct",
+        "fields": [{"name": "a", "type": "float", "size": 4}, {"name": "b", "type": "float", "size": 4}],
+        "file": "test.hlsl",
+        "line": 10,
+    }
+    cpp_data = {
+        "name": "CandidateStruct",
+        "fields": [{"name": "a", "type": "float", "size": 4}, {"name": "c", "type": "float", "size": 4}],
+        "file": "test2.h",
+        "line": 20,
+    }
+    score, align_matches, report = align_structs(cpp_data, hlsl_data)
+    candidates = [StructCandidate("CandidateStruct", cpp_data, score, align_matches, report)]
+
+    with patch("hlslkit.buffer_scan.align_structs") as mock_align:
+        table = generate_comparison_table(
+            "TestStruct", "", hlsl_data, {}, [], {"score": 0.0}, candidates, show_top_candidate=True
+        )
+    # The candidate's own alignment is used instead of realigning
+    mock_align.assert_not_called()
+    assert "CandidateStruct (top candidate - rejected)" in table
+    assert f"{score:.2f}" in table
+    assert "Top 5 of 1 Candidates Reviewed" in table
+
+
 def test_generate_comparison_table_perfect_match():
     from hlslkit.buffer_scan import generate_comparison_table
 
@@ -1,9 +1,12 @@
 """Tests for file processing and extraction functionality."""
 
+import os
 import re
 from unittest.mock import MagicMock, mock_open, patch
 
 from hlslkit.buffer_scan import (
+    _build_line_map,
+    _compute_include_dirs,
     _format_shader_usage,
     clean_body,
     emphasize_if,
@@ -76,6 +79,31 @@ class TestFileProcessing:
             assert isinstance(result, list)
             assert isinstance(compilation_units, dict)
 
+    def test_compute_include_dirs_is_cached(self, tmp_path):
+        """Test that include dir discovery walks the tree once per cwd."""
+        (tmp_path / "package" / "Shaders" / "Common" / "Sub").mkdir(parents=True)
+        (tmp_path / "features" / "Grass" / "Shaders").mkdir(parents=True)
+        cwd = str(tmp_path)
+
+        with patch("os.walk", wraps=os.walk) as mock_walk:
+            first = _compute_include_dirs(cwd)
+            second = _compute_include_dirs(cwd)
+
+        assert first is second
+        mock_walk.assert_called_once()
+        assert os.path.join(cwd, "package", "Shaders", "Common", "Sub") in first
+        assert os.path.join(cwd, "features", "Grass", "Shaders") in first
+        assert len(first) == len(set(first))
+
+    def test_build_line_map_skips_included_files(self):
+        """Test that _build_line_map follows #line directives and ignores include content."""
+        original_lines = ['#include "a.hlsli"', "float x;", "float y;"]
+        contents = '#line 1 "p.hlsl"\n#line 1 "a.hlsli"\nfloat inc;\n#line 2 "p.hlsl"\nfloat x;\nfloat y;'
+
+        line_map = _build_line_map(contents, original_lines, "p.hlsl")
+
+        assert line_map == {0: 2, 1: 3}
+
 
 class TestStructExtraction:
     """Test struct extraction functions."""
@@ -315,6 +343,24 @@ class TestOutputFormatting:
         out = capsys.readouterr().out
         assert "Buffer Table" in out
 
+    def test_print_buffers_and_conflicts_multi_define_combination(self, capsys):
+        """Test register conflicts keep define combinations that contain underscores intact."""
+        result_map = {
+            f"{name.lower()}.hlsl:{name.lower()}": {
+                "Register": "b0",
+                "Feature": name,
+                "Type": "cbuffer",
+                "Name": name,
+                "File": f"[{name}.hlsl:1]({name}.hlsl#L1)",
+                "File Path": f"{name}.hlsl",
+                "Define Combinations": {"PSHADER_VR"},
+            }
+            for name in ("First", "Second")
+        }
+        print_buffers_and_conflicts(result_map, {}, show_conflicts=True)
+        out = capsys.readouterr().out
+        assert "## Register b0 with defines: PSHADER, VR" in out
+
     def test_print_buffers_and_conflicts_empty(self, capsys):
         """Test printing buffers and conflicts with empty data prints 'No results found.'"""
         result_map = {}
@@ -235,3 +235,89 @@ class TestFileScanner:
         # No structs should be found
         assert len(hlsl_structs) == 0
         assert len(cpp_structs) == 0
+
+    @patch("os.walk")
+    @patch("builtins.open", new_callable=mock_open, read_data="struct TestStruct { int a; };")
+    @patch("hlslkit.buffer_scan.process_file")
+    def test_buffer_and_struct_scans_share_one_walk(self, mock_process_file, mock_open, mock_walk):
+        """Test that scan_for_buffers and scan_for_structs reuse a single directory walk."""
+        scanner = FileScanner("/test/path")
+        mock_walk.return_value = [
+            ("/test/path", [], ["test.hlsl", "test.h", "notes.txt"]),
+        ]
+
+        scanner.scan_for_buffers(
+            re.compile(r".*"), re.compile(r"(?P<feature>test)"), re.compile(r"cbuffer"), {}, [{"PSHADER": ""}]
+        )
+        hlsl_structs, cpp_structs = scanner.scan_for_structs()
+
+        mock_walk.assert_called_once()
+        assert mock_process_file.call_count == 1
+        assert "TestStruct" in hlsl_structs
+        assert "TestStruct" in cpp_structs
+
+    @patch("os.walk")
+    @patch("builtins.open", new_callable=mock_open, read_data="cbuffer Test : register(b0) {};")
+    @patch("hlslkit.buffer_scan.process_file")
+    def test_scan_for_buffers_reads_each_file_once(self, mock_process_file, mock_file, mock_walk):
+        """Test that scan_for_buffers reads a file once and shares it across defines."""
+        scanner = FileScanner("/test/path")
+        mock_walk.return_value = [
+            ("/test/path", [], ["test.hlsl"]),
+        ]
+
+        scanner.scan_for_buffers(
+            re.compile(r".*"), re.compile(r"(?P<feature>test)"), re.compile(r"cbuffer"), {}, [{"PSHADER": ""}, {}]
+        )
+
+        mock_file.assert_called_once()
+        assert mock_process_file.call_count == 2
+        for call in mock_process_file.call_args_list:
+            assert call.kwargs["original_contents"] == "cbuffer Test : register(b0) {};"
+
+    @patch("os.walk")
+    def test_walk_once_short_paths_match_get_short_path(self, mock_walk):
+        """Test that per-directory short path resolution matches _get_short_path."""
+        scanner = FileScanner("/test/path")
+        mock_walk.return_value = [
+            ("/test/path", [], ["Top.HLSL", "readme.md"]),
+            ("/test/path/src/Features", [], ["Grass.h"]),
+            ("/test/path/skyrim-community-shaders/package/Shaders", [], ["Lighting.hlsl"]),
+        ]
+
+        files = scanner._walk_once()
+
+        assert [(short_path, is_hlsl) for _, _, short_path, is_hlsl in files] == [
+            ("Top.HLSL", True),
+            ("src/Features/Grass.h", False),
+            ("package/Shaders/Lighting.hlsl", True),
+        ]
+        for _, full_path, short_path, _ in files:
+            assert short_path == scanner._get_short_path(full_path)
+
+    def test_scan_for_buffers_parallel_matches_serial(self, tmp_path):
+        """Test that scanning with worker processes gives the same results as a serial scan."""
+        for name, register in (("First", "b0"), ("Second", "b1"), ("Third", "t2")):
+            feature_dir = tmp_path / "features" / name / "Shaders"
+            feature_dir.mkdir(parents=True)
+            (feature_dir / f"{name}.hlsl").write_text(
+                f"cbuffer {name}Buffer : register({register}) {{ float4 value; }};\n", encoding="utf-8"
+            )
+        shader_pattern = re.compile(
+            r"(?P<type>cbuffer)(?:<(?P<template_name>\w+)>)?\s+(?P<name>\w+)\s*:\s*register\s*"
+            r"\((?P<buffer_type>[a-z])(?P<buffer_number>\d+)\)",
+            re.MULTILINE,
+        )
+        args = (
+            re.compile(r".*"),
+            re.compile(r"features[/\\](?P<feature>[^/\\]+)"),
+            shader_pattern,
+            {"b": "CBV", "t": "SRV"},
+            [{"PSHADER": ""}, {"VSHADER": ""}],
+        )
+
+        serial = FileScanner(str(tmp_path)).scan_for_buffers(*args)
+        parallel = FileScanner(str(tmp_path)).scan_for_buffers(*args, jobs=2)
+
+        assert len(serial[0]) == 3
+        assert parallel == serial
@@ -1,5 +1,8 @@
 """Tests for struct analysis and comparison functionality."""
 
+import sys
+from unittest.mock import patch
+
 from hlslkit.buffer_scan import (
     AnalysisLink,
     InvalidStructDictType,
@@ -7,13 +10,18 @@ from hlslkit.buffer_scan import (
     StructCandidate,
     StructMatch,
     _compute_alignment_report,
+    _fields_size,
+    _name_similarity_key,
+    _name_similarity_upper_bound,
     align_structs,
+    align_up,
     are_fields_equivalent,
     calculate_hlsl_struct_size,
     calculate_struct_size,
     compute_match_score,
     compute_name_similarity,
     compute_struct_alignment,
+    compute_type_similarity,
     count_field_differences,
     fuzzy_lcs,
     generate_comparison_table,
@@ -58,6 +66,14 @@ class TestStructSizeCalculation:
         result = calculate_hlsl_struct_size(fields)
         assert result == 16  # HLSL uses 16-byte alignment
 
+    def test_align_up(self):
+        """Test rounding offsets up to power-of-two boundaries."""
+        assert align_up(0, 16) == 0
+        assert align_up(1, 16) == 16
+        assert align_up(16, 16) == 16
+        assert align_up(17, 16) == 32
+        assert align_up(5, 4) == 8
+
 
 class TestFieldComparison:
     """Test field comparison functions."""
@@ -93,6 +109,13 @@ class TestFieldComparison:
         assert 0 <= type_sim <= 1
         assert isinstance(is_equivalent, bool)
 
+    def test_compute_type_similarity(self):
+        """Test type similarity treats HLSL vectors and C++ arrays as equivalent."""
+        assert compute_type_similarity("float4", "float[4]") == 1.0
+        assert compute_type_similarity("uint", "uint") == 1.0
+        assert 0.7 <= compute_type_similarity("float3", "float4") < 1.0
+        assert compute_type_similarity("bool", "float4x4") == 0.0
+
 
 class TestStructAlignment:
     """Test struct alignment functions."""
@@ -106,6 +129,41 @@ class TestStructAlignment:
         assert isinstance(align_matches, list)
         assert isinstance(report, dict)
 
+    def test_compute_struct_alignment_size_mismatch(self):
+        """Test that pairs far apart in size and field count are scored without alignment."""
+        cpp_data = {"name": "Big", "fields": [{"name": f"v{i}", "type": "float4", "size": 16} for i in range(8)]}
+        hlsl_data = {"name": "Big", "fields": [{"name": "v0", "type": "float4", "size": 16}]}
+        score, align_matches, report = compute_struct_alignment(cpp_data, hlsl_data)
+        assert score == 0.0
+        assert align_matches == []
+        assert report["total_fields"] == 1
+        assert report["cpp_total_fields"] == 8
+        assert report["size_difference"] == 112
+
+    def test_size_gated_candidate_ranks_last(self):
+        """Test that a size-gated candidate scores 0, so a runner-up that passes the checks is accepted."""
+
+        def field(name):
+            return {"name": name, "type": "float4", "size": 16}
+
+        hlsl_data = {"name": "Light", "file": "l.hlsl", "line": 1, "fields": [field("color"), field("dir")]}
+        cpp_structs = {
+            # Same name, but 9 fields against 2: gated, although its alignment alone would rank it first
+            "Light": [
+                {
+                    "name": "Light",
+                    "file": "l.h",
+                    "line": 1,
+                    "fields": [field("color"), field("dir")] + [field(f"extra{i}") for i in range(7)],
+                }
+            ],
+            "Glow": [{"name": "Glow", "file": "g.h", "line": 1, "fields": [field("color"), field("dir")]}],
+        }
+        analyzer = StructAnalyzer({"Light": [hlsl_data]}, cpp_structs)
+        match = analyzer._match_struct("Light", hlsl_data)
+        assert match.cpp_name == "Glow"
+        assert [(c.name, c.score) for c in match.candidates][-1] == ("Light", 0.0)
+
     def test_compute_match_score(self):
         """Test computing match score."""
         hlsl_fields = [{"name": "a", "type": "int", "size": 4}]
@@ -132,6 +190,32 @@ class TestStructAlignment:
         assert isinstance(align_matches, list)
         assert isinstance(report, dict)
 
+    def test_compute_alignment_report_field_counts(self):
+        """Test field counts for partially aligned structs."""
+        cpp_fields = [
+            {"name": "position", "type": "float4", "size": 16},
+            {"name": "cppOnly", "type": "float", "size": 4},
+        ]
+        hlsl_fields = [
+            {"name": "position", "type": "float4", "size": 16},
+            {"name": "hlslOnly", "type": "uint", "size": 4},
+            {"name": "pad0", "type": "float", "size": 4},
+        ]
+        _, report = _compute_alignment_report(cpp_fields, hlsl_fields, {}, {})
+        assert report["total_fields"] == 2
+        assert report["missing_fields"] == 0
+        assert report["field_matches"] == 1
+        assert report["unmatched_hlsl_fields"] == ["hlslOnly", "pad0"]
+        assert report["unmatched_cpp_fields"] == ["cppOnly"]
+
+    def test_fields_size_reuses_stored_size(self):
+        """Test that only stored sizes describing the same unaligned fields are reused."""
+        fields = [{"name": "a", "type": "float", "size": 4}]
+        assert _fields_size({"fields": fields, "size": 99}, fields) == 99
+        assert _fields_size({"fields": list(fields), "size": 99}, fields) == 4
+        assert _fields_size({"fields": fields, "size": 16, "is_cbuffer": True}, fields) == 4
+        assert _fields_size({"fields": fields}, fields) == 4
+
     def test_align_structs(self):
         """Test aligning structs."""
         cpp_data = {"fields": [{"name": "a", "type": "int", "size": 4}], "size": 4}
@@ -164,6 +248,22 @@ class TestFuzzyLCS:
         result = fuzzy_lcs(hlsl_fields, cpp_fields)
         assert isinstance(result, list)
 
+    def test_fuzzy_lcs_skips_pairs_below_length_bound(self):
+        """Test that pairs with very different name lengths are skipped without losing matches."""
+        hlsl_fields = [{"name": "worldViewProjection"}, {"name": "color"}, {"name": "pad[2]"}]
+        cpp_fields = [{"name": "ab"}, {"name": "gColor"}, {"name": "WorldViewProjection"}, {"name": "pad"}]
+        compute_name_similarity.cache_clear()
+        assert fuzzy_lcs(hlsl_fields, cpp_fields) == [(0, 2), (1, 1), (2, 3)]
+        assert compute_name_similarity.cache_info().currsize < len(hlsl_fields) * len(cpp_fields)
+
+    def test_name_similarity_upper_bound(self):
+        """Test the name similarity bound never undercuts the real score."""
+        names = ["pos", "position", "gColor", "color", "pad[3]", "pad", "fTime", "worldViewProj", "a", ""]
+        for hlsl_name in names:
+            for cpp_name in names:
+                bound = _name_similarity_upper_bound(_name_similarity_key(hlsl_name), _name_similarity_key(cpp_name))
+                assert bound >= compute_name_similarity(hlsl_name, cpp_name)
+
 
 class TestNameSimilarity:
     """Test name similarity functions."""
@@ -183,6 +283,14 @@ class TestNameSimilarity:
         result = compute_name_similarity("field1", "field2")
         assert 0 <= result < 1.0
 
+    def test_compute_name_similarity_is_memoized(self):
+        """Test that repeated name pairs are served from the cache."""
+        compute_name_similarity.cache_clear()
+        first = compute_name_similarity("diffuseColor", "DiffuseColour")
+        second = compute_name_similarity("diffuseColor", "DiffuseColour")
+        assert first == second
+        assert compute_name_similarity.cache_info().hits == 1
+
 
 class TestFieldDifferences:
     """Test field difference counting."""
@@ -229,7 +337,7 @@ class TestStructAnalyzer:
         """Test adding buffer location."""
         analyzer = StructAnalyzer({}, {})
         analyzer.add_buffer_location("test.hlsl", "TestBuffer", 10)
-        key = "test.hlsl:testbuffer"
+        key = ("test.hlsl", "testbuffer")
         assert key in analyzer.buffer_locations
 
     def test_get_buffer_location(self):
@@ -245,6 +353,26 @@ class TestStructAnalyzer:
         result = analyzer.get_buffer_location("test.hlsl", "TestBuffer", 10)
         assert result is None
 
+    def test_add_buffer_locations(self):
+        """Test adding buffer locations in bulk matches adding them one at a time."""
+        locations = [("Test.hlsl", "TestBuffer", 10), ("other.hlsl", "Other", 3), ("test.hlsl", "testbuffer", 12)]
+        bulk = StructAnalyzer({}, {})
+        bulk.add_buffer_locations(locations)
+        single = StructAnalyzer({}, {})
+        for file, buffer_name, line in locations:
+            single.add_buffer_location(file, buffer_name, line)
+        assert bulk.buffer_locations == single.buffer_locations
+        assert bulk.buffer_locations[("test.hlsl", "testbuffer")] == ("test.hlsl", "testbuffer")
+
+    def test_add_buffer_location_interns_names(self):
+        """Test that stored buffer locations share interned file and buffer name strings."""
+        analyzer = StructAnalyzer({}, {})
+        file = "".join(["shaders/", "a.hlsl"])
+        analyzer.add_buffer_location(file, "".join(["Light", "Data"]), 1)
+        stored_file, stored_name = analyzer.buffer_locations[("shaders/a.hlsl", "lightdata")]
+        assert stored_file is sys.intern("shaders/a.hlsl")
+        assert stored_name is sys.intern("LightData")
+
     def test_is_composite_buffer_true(self):
         """Test composite buffer detection when true."""
         analyzer = StructAnalyzer({}, {})
@@ -269,6 +397,18 @@ class TestStructAnalyzer:
         assert isinstance(result, list)
         assert len(result) == 1
 
+    def test_get_nested_fields_cached(self):
+        """Test that flattened fields are cached per struct and recomputed when its field list is replaced."""
+        inner = {"name": "Inner", "file": "a.hlsl", "fields": [{"name": "x", "type": "float", "size": 4}]}
+        outer = {"name": "Outer", "file": "a.hlsl", "fields": [{"name": "inner", "type": "Inner", "size": 4}]}
+        analyzer = StructAnalyzer({"Inner": [inner], "Outer": [outer]}, {})
+        first = analyzer.get_nested_fields(outer)
+        assert [f["name"] for f in first] == ["x"]
+        assert analyzer.get_nested_fields(outer) is first
+
+        outer["fields"] = [{"name": "y", "type": "float", "size": 4}]
+        assert [f["name"] for f in analyzer.get_nested_fields(outer)] == ["y"]
+
     def test_get_field_name(self):
         """Test getting field name."""
         analyzer = StructAnalyzer({}, {})
@@ -285,6 +425,19 @@ class TestStructAnalyzer:
         result = analyzer.find_struct_candidates("TestStruct", hlsl_data, hlsl_fields, matched_cpp_structs)
         assert isinstance(result, list)
 
+    def test_find_struct_candidates_reuses_cpp_variants(self):
+        """Test that C++ original and flattened variants are built once and shared across HLSL structs."""
+        inner = {"name": "Inner", "file": "a.h", "fields": [{"name": "x", "type": "float", "size": 4}]}
+        outer = {"name": "Outer", "file": "a.h", "fields": [{"name": "inner", "type": "Inner", "size": 4}]}
+        analyzer = StructAnalyzer({}, {"Inner": [inner], "Outer": [outer]})
+        hlsl_data = {"fields": [{"name": "x", "type": "float", "size": 4}], "file": "test.hlsl", "line": 1}
+
+        first = analyzer.find_struct_candidates("A", hlsl_data, hlsl_data["fields"], set())
+        second = analyzer.find_struct_candidates("B", hlsl_data, hlsl_data["fields"], set())
+        assert sorted((c[0], len(c[1]["fields"])) for c in first) == [("Inner", 1), ("Outer", 1), ("Outer", 1)]
+        assert {id(c[1]) for c in first} == {id(c[1]) for c in second}
+        assert outer["fields"][0]["name"] == "inner"
+
     def test_find_best_match_from_candidates(self):
         """Test finding best match from candidates."""
         analyzer = StructAnalyzer({}, {})
@@ -295,6 +448,42 @@ class TestStructAnalyzer:
         assert isinstance(result, tuple)
         assert len(result) == 2
 
+    def test_find_best_match_reuses_candidate_alignment(self):
+        """Test that candidate alignments are reused when the struct name weight is unchanged."""
+        fields = [{"name": f"f{i}", "type": "float", "size": 4} for i in range(4)]
+        hlsl_data = {"name": "Buf", "fields": fields, "file": "a.hlsl", "line": 1}
+        cpp_data = {"name": "Buf", "fields": [dict(f) for f in fields], "file": "a.h", "line": 2}
+        analyzer = StructAnalyzer({"Buf": [hlsl_data]}, {"Buf": [cpp_data]})
+        candidates = analyzer.find_struct_candidates("Buf", hlsl_data, fields, set())
+        assert len(candidates[0]) == 5
+
+        with patch("hlslkit.buffer_scan.align_structs") as mock_align:
+            best_match, _ = analyzer._find_best_match_from_candidates("Buf", hlsl_data, fields, candidates, False)
+        mock_align.assert_not_called()
+        assert best_match.score == candidates[0][2]
+        assert best_match.report is candidates[0][4]
+
+    def test_find_best_match_skips_realigning_gated_candidates(self):
+        """Test that pairs rejected by the size gate are not realigned for small structs."""
+        hlsl_data = {
+            "name": "Small",
+            "fields": [{"name": "x", "type": "float", "size": 4}],
+            "file": "a.hlsl",
+            "line": 1,
+        }
+        big = [{"name": f"m{i}", "type": "float4x4", "size": 64} for i in range(10)]
+        cpp_data = {"name": "Big", "fields": big, "file": "a.h", "line": 2}
+        analyzer = StructAnalyzer({"Small": [hlsl_data]}, {"Big": [cpp_data]})
+        candidates = analyzer.find_struct_candidates("Small", hlsl_data, hlsl_data["fields"], set())
+        assert candidates[0][3] == []
+
+        with patch("hlslkit.buffer_scan.align_structs") as mock_align:
+            best_match, _ = analyzer._find_best_match_from_candidates(
+                "Small", hlsl_data, hlsl_data["fields"], candidates, False
+            )
+        mock_align.assert_not_called()
+        assert best_match.score == 0.0
+
     def test_is_match_good_enough(self):
         """Test match quality assessment."""
         analyzer = StructAnalyzer({}, {})
@@ -304,6 +493,34 @@ class TestStructAnalyzer:
         result = analyzer._is_match_good_enough(score, report, candidates)
         assert isinstance(result, bool)
 
+    def test_is_match_good_enough_rejects_empty_structs(self):
+        """Test that structs without non-padding fields are rejected instead of dividing by zero."""
+        analyzer = StructAnalyzer({}, {})
+        report = {"total_fields": 0, "cpp_total_fields": 0}
+        assert analyzer._is_match_good_enough(0.9, report, [], "A", "B") is False
+
+    def test_is_match_good_enough_similar_names_skip_size_check(self):
+        """Test that very similar names are accepted despite a large size difference."""
+        analyzer = StructAnalyzer({}, {})
+        report = {"total_fields": 4, "cpp_total_fields": 4, "exact_matches": 4, "size_difference": 256}
+        assert analyzer._is_match_good_enough(0.7, report, [], "LightData", "LightData") is True
+        assert analyzer._is_match_good_enough(0.7, report, [], "LightData", "Material") is False
+
+    def test_generate_comparison_tables_groups_composite_members(self):
+        """Test that structs inside composite buffers are emitted after regular structs."""
+        hlsl_structs = {
+            name: [{"fields": [], "file": "test.hlsl", "line": line}]
+            for line, name in enumerate(["PerFrame", "Light", "Other"], start=1)
+        }
+        analyzer = StructAnalyzer(hlsl_structs, {})
+        analyzer.composite_buffers = {"PerFrame": ["Light"]}
+        matches = [
+            StructMatch(name, "test.hlsl", line, "", "", 0, 0.0, [], {}, [])
+            for line, name in enumerate(["PerFrame", "Light", "Other"], start=1)
+        ]
+        analyzer._generate_comparison_tables(matches, print_tables=False)
+        assert [t["hlsl_name"] for t in analyzer.comparison_tables] == ["Other", "Light"]
+
     def test_compare_all_structs(self):
         """Test comparing all structs."""
         analyzer = StructAnalyzer({}, {})
@@ -311,6 +528,106 @@ class TestStructAnalyzer:
         result = analyzer.compare_all_structs(result_map)
         assert isinstance(result, dict)
 
+    def test_compare_all_structs_tolerates_malformed_entries(self):
+        """Test that malformed struct entries are skipped when building comparison tables."""
+        fields = [{"name": "x", "type": "float", "size": 4}]
+        hlsl_structs = {"A": ["bad"], "B": [{"name": "B", "file": "b.hlsl", "line": 1, "fields": fields}]}
+        cpp_structs = {
+            "B": [{"name": "B", "file": "b.h", "line": 2, "fields": fields}],
+            "C": [{"name": "C", "file": "c.h", "fields": [{"name": "y", "type": "int", "size": 4}]}],
+        }
+        analyzer = StructAnalyzer(hlsl_structs, cpp_structs)
+        analyzer.compare_all_structs({})
+        assert [t["hlsl_name"] for t in analyzer.comparison_tables] == ["B"]
+
+    def test_compare_all_structs_same_name_fast_path(self):
+        """Test that an exactly aligned same-named C++ struct is accepted without scanning every candidate."""
+        fields = [{"name": "position", "type": "float4", "size": 16}, {"name": "color", "type": "float3", "size": 12}]
+        hlsl_structs = {"Light": [{"name": "Light", "fields": fields, "file": "light.hlsl", "line": 1}]}
+        cpp_structs = {
+            "LIGHT": [{"name": "LIGHT", "fields": [dict(f) for f in fields], "file": "light.h", "line": 2}],
+            "Other": [{"name": "Other", "fields": [dict(f) for f in fields], "file": "other.h", "line": 3}],
+        }
+        analyzer = StructAnalyzer(hlsl_structs, cpp_structs)
+        with patch.object(StructAnalyzer, "find_struct_candidates") as mock_find:
+            analyzer.compare_all_structs({})
+        mock_find.assert_not_called()
+        assert [(m.hlsl_name, m.cpp_name) for m in analyzer.matches] == [("Light", "LIGHT")]
+
+        # A same-named struct with differing fields falls back to the full candidate scan
+        cpp_structs["LIGHT"][0]["fields"] = fields[:1]
+        analyzer = StructAnalyzer(hlsl_structs, cpp_structs)
+        with patch.object(
+            StructAnalyzer, "find_struct_candidates", autospec=True, side_effect=StructAnalyzer.find_struct_candidates
+        ) as mock_find:
+            analyzer.compare_all_structs({})
+        mock_find.assert_called_once()
+
+    def test_update_result_map_links_by_file_then_name(self):
+        """Test that analysis links prefer a file+name match and fall back to a name-only match."""
+        analyzer = StructAnalyzer({}, {})
+        analyzer.analysis_results = {
+            "b.hlsl:light": {"link": "light-link"},
+            "c.hlsl:material": {"link": "material-link"},
+            "d.hlsl:float4": {"link": "float4-link"},
+        }
+        result_map = {
+            "a.hlsl:light": {"File Path": "a.hlsl", "Name": "Light"},
+            "b.hlsl:light0": {"File Path": "B.hlsl", "Name": "LIGHT"},
+            "e.hlsl:material": {"File Path": "e.hlsl", "Name": "Material"},
+            "f.hlsl:float4": {"File Path": "f.hlsl", "Name": "float4"},
+        }
+        analyzer.update_result_map(result_map)
+        assert result_map["a.hlsl:light"]["Matching Struct Analysis"] == "Unmatched"
+        assert result_map["b.hlsl:light0"]["Matching Struct Analysis"] == "light-link"
+        assert result_map["e.hlsl:material"]["Matching Struct Analysis"] == "material-link"
+        # Base types never fall back to a name-only match
+        assert result_map["f.hlsl:float4"]["Matching Struct Analysis"] == "Unmatched"
+
+    def test_print_comparison_tables_only_matched(self, capsys):
+        """Test that only_matched skips unmatched structs and composite buffers print their sub-buffers."""
+
+        def make_table(name, file):
+            hlsl_data = {"name": name, "file": file, "line": 1, "fields": [{"name": "a", "type": "float", "size": 4}]}
+            return {
+                "hlsl_name": name,
+                "cpp_name": "",
+                "hlsl_data": hlsl_data,
+                "cpp_data": {},
+                "align_matches": [],
+                "report": {},
+                "candidates": [],
+            }
+
+        analyzer = StructAnalyzer({}, {})
+        analyzer.comparison_tables = [
+            make_table("Matched", "a.hlsl"),
+            make_table("Missing", "b.hlsl"),
+            make_table("Sub", "c.hlsl"),
+            make_table("Composite", "c.hlsl"),
+        ]
+        analyzer.composite_buffers = {"Composite": ["Sub"]}
+        analyzer.analysis_links = {
+            "a.hlsl:matched": {"status": "Matched"},
+            "b.hlsl:missing": {"status": "Unmatched"},
+            "c.hlsl:sub": {"status": "Matched"},
+            "c.hlsl:composite": {"status": "Matched"},
+        }
+        analyzer.add_buffer_location("a.hlsl", "Matched", 1)
+        analyzer.add_buffer_location("b.hlsl", "Missing", 1)
+        analyzer.add_buffer_location("c.hlsl", "Composite", 1)
+
+        analyzer.print_comparison_tables(only_matched=True)
+        output = capsys.readouterr().out
+        assert "Matched" in output
+        assert "Missing" not in output
+        assert "## Composite Buffer: Composite" in output
+        assert "HLSL `Composite`" in output
+        assert "### HLSL `Sub`" in output
+
+        analyzer.print_comparison_tables()
+        assert "Missing" in capsys.readouterr().out
+
     def test_update_result_map(self):
         """Test updating result map."""
         analyzer = StructAnalyzer({}, {})
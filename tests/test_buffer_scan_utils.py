@@ -3,16 +3,20 @@
 from unittest.mock import patch
 
 from hlslkit.buffer_scan import (
+    BUFFER_DECL_REGEX,
     add_debug_info,
     capture_pattern,
     clean_body,
     clear_debug_info,
+    count_non_padding_fields,
     create_link,
     create_struct_analysis_link,
     create_struct_section_id,
     emphasize_if,
     extract_matrix_size,
     finditer_with_line_numbers,
+    format_debug_info,
+    get_define_key,
     get_defines_list,
     get_excluded_dirs,
     get_field_size,
@@ -23,6 +27,7 @@ from hlslkit.buffer_scan import (
     parse_field,
     parse_type_with_array,
     preprocess_content,
+    render_markdown_table,
     strip_array_notation,
 )
 
@@ -38,6 +43,14 @@ class TestDebugInfo:
         add_debug_info("test message")
         assert "test message" in DEBUG_INFO
 
+    def test_add_debug_info_deferred_format(self):
+        """Test that debug arguments are formatted only when the debug info is rendered."""
+        clear_debug_info()
+        add_debug_info("plain")
+        add_debug_info("%s vs %s: score=%s", "A", "B", 0.5)
+        assert format_debug_info() == "plain\nA vs B: score=0.5"
+        clear_debug_info()
+
     def test_clear_debug_info(self):
         """Test clearing debug information."""
         from hlslkit.buffer_scan import DEBUG_INFO
@@ -68,6 +81,12 @@ class TestLinkGeneration:
         expected = "https://github.com/doodlum/skyrim-community-shaders/blob/dev/test/file%20with%20spaces.hlsl"
         assert result == expected
 
+    def test_create_link_quotes_non_ascii_path(self):
+        """Test creating a link for a path that needs percent-encoding."""
+        result = create_link("features/Caf\u00e9/a~b.hlsl")
+        expected = "https://github.com/doodlum/skyrim-community-shaders/blob/dev/features/Caf%C3%A9/a~b.hlsl"
+        assert result == expected
+
     def test_create_struct_section_id(self):
         """Test creating struct section ID."""
         result = create_struct_section_id("TestStruct", "test_file.hlsl")
@@ -103,6 +122,12 @@ class TestLinkGeneration:
         result = create_struct_analysis_link("TestStruct", "test.hlsl", "CustomStatus")
         assert result == "[`TestStruct`](#hlsl-teststruct-testhlsl)"
 
+    def test_render_markdown_table(self):
+        """Test rendering rows as a markdown table."""
+        rows = [{"Name": "a", "Type": "float4"}, {"Name": "", "Type": "uint"}]
+        result = render_markdown_table(rows)
+        assert result == "| Name | Type |\n|---|---|\n| a | float4 |\n|  | uint |"
+
 
 class TestPatternMatching:
     """Test pattern matching functions."""
@@ -126,6 +151,14 @@ class TestPatternMatching:
         assert len(result) == 2  # Both "test" in filename and "test" in content
         assert result[0][0] == 100  # adjusted line number for content
 
+    def test_finditer_with_line_numbers_with_multiple_line_directives(self):
+        """Test finditer_with_line_numbers uses the nearest preceding #line directive."""
+        text = '#line 10 "a.hlsl"\nfoo\nbar\n#line 50 "b.hlsl"\nfoo'
+        result = finditer_with_line_numbers(r"foo", text)
+        assert len(result) == 2
+        assert result[0][0] == 11  # offset from the first directive
+        assert result[1][0] == 51  # offset from the second directive
+
     def test_finditer_with_line_numbers_with_line_map(self):
         """Test finditer_with_line_numbers with line map."""
         line_map = {1: 10, 2: 20}
@@ -134,6 +167,13 @@ class TestPatternMatching:
         assert result[0][0] == 10  # mapped line number
         assert result[1][0] == 20  # mapped line number
 
+    def test_buffer_decl_regex(self):
+        """Test BUFFER_DECL_REGEX captures declared register names."""
+        line = "cbuffer PerFrame : register(b0) { Texture2D<float4> Tex : register(t1); }"
+        names = [m.group("name") for m in BUFFER_DECL_REGEX.finditer(line)]
+        assert names == ["PerFrame", "Tex"]
+        assert not BUFFER_DECL_REGEX.search("float4 PerFrame;")
+
     def test_capture_pattern(self):
         """Test capture_pattern function."""
         text = '#line 50 "test.hlsl"\ntest string\nanother test'
@@ -158,6 +198,13 @@ class TestConfiguration:
         assert isinstance(defines, list)
         assert all(isinstance(d, dict) for d in defines)
 
+    def test_get_define_key(self):
+        """Test define keys use the standard stage order and ignore other defines."""
+        assert get_define_key(frozenset({"VR", "PSHADER"})) == "PSHADER_VR"
+        assert get_define_key(frozenset({"VSHADER", "OTHER"})) == "VSHADER"
+        assert get_define_key(frozenset()) == "no_defines"
+        assert get_define_key(frozenset({"VR", "PSHADER"})) is get_define_key(frozenset({"PSHADER", "VR"}))
+
     def test_get_excluded_dirs(self):
         """Test getting excluded directories."""
         with patch("os.path.exists", return_value=True):
@@ -218,6 +265,17 @@ class TestStructUtilities:
         assert result is not None
         assert result["name"] == "field"
 
+    def test_parse_field_array_dimensions(self):
+        """Test parsing one- and two-dimensional array fields."""
+        for is_hlsl in (True, False):
+            single = parse_field("float4 lights[4]", "TestStruct", is_hlsl)
+            assert single["name"] == "lights[4]"
+            assert single["array_size"] == 4
+            grid = parse_field("float grid[2][3]", "TestStruct", is_hlsl)
+            assert grid["name"] == "grid[6]"
+            assert grid["array_size"] == 6
+            assert grid["size"] == 24
+
     def test_parse_type_with_array(self):
         """Test parsing type with array."""
         result = parse_type_with_array("int[10]")
@@ -262,6 +320,24 @@ class TestStructUtilities:
         assert size == 4  # default size
         assert is_unknown
 
+    def test_base_type_fast_path_matches_parsed_result(self):
+        """Test that every base type resolves the same with or without parsing."""
+        from hlslkit.buffer_scan import BASE_TYPE_SIZES
+
+        for type_name, size in BASE_TYPE_SIZES.items():
+            assert normalize_field_type(type_name) == type_name
+            assert get_field_size(type_name, 3) == (size * 3, False)
+            # Namespaced spelling takes the parsing path
+            assert get_field_size(f"ns::{type_name}", 3) == (size * 3, False)
+
+    def test_get_field_size_is_memoized(self):
+        """Test that repeated type lookups are served from the cache."""
+        get_field_size.cache_clear()
+        first = get_field_size("float4x4", 2)
+        second = get_field_size("float4x4", 2)
+        assert first == second == (128, False)
+        assert get_field_size.cache_info().hits == 1
+
     def test_is_padding_field(self):
         """Test padding field detection."""
         field = {"name": "padding", "type": "int"}
@@ -270,6 +346,19 @@ class TestStructUtilities:
         field = {"name": "normal_field", "type": "int"}
         assert not is_padding_field(field)
 
+    def test_is_padding_field_name_variants(self):
+        """Test padding detection across prefix, suffix and array spellings."""
+        for name in ("pad0", "_pad[3]", "Padding", "_padding1", "structPad", "extra_padding[2]"):
+            assert is_padding_field({"name": name, "type": "float"}), name
+        for name in ("spadex", "offset[pad]", "position"):
+            assert not is_padding_field({"name": name, "type": "float"}), name
+
+    def test_count_non_padding_fields(self):
+        """Test counting fields that are not padding."""
+        fields = [{"name": "position"}, {"name": "pad0[3]"}, {"name": "color"}, {"name": "_padding"}]
+        assert count_non_padding_fields(fields) == 2
+        assert count_non_padding_fields([]) == 0
+
     def test_strip_array_notation(self):
         """Test stripping array notation."""
         assert strip_array_notation("field[10]") == "field"